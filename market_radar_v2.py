@@ -13,12 +13,24 @@ Reddit'ten iş fırsatlarını AI ile tarayan gelişmiş bot.
 """
 
 import requests
+import asyncio
 import time
 import json
 import sys
 import os
 import csv
-from datetime import datetime
+import math
+import random
+import re
+import sqlite3
+import zlib
+from array import array
+import heapq
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # Çıktı encoding'ini UTF-8'e zorla (Windows için)
@@ -35,10 +47,49 @@ class Config:
     # OpenAI
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
+    # Birden fazla anahtar/proje için virgülle ayrılmış liste (OPENAI_API_KEY'e ek olarak)
+    OPENAI_API_KEYS = [k.strip() for k in os.getenv('OPENAI_API_KEYS', '').split(',') if k.strip()]
     
     # Gemini
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-2.5-flash-lite')
+    GEMINI_API_KEYS = [k.strip() for k in os.getenv('GEMINI_API_KEYS', '').split(',') if k.strip()]
+    
+    # Anahtar Havuzu Ayarları
+    KEY_RPM_LIMIT = int(os.getenv('KEY_RPM_LIMIT', '60'))  # anahtar başına dakikalık istek limiti
+    KEY_MAX_IN_FLIGHT = int(os.getenv('KEY_MAX_IN_FLIGHT', '2'))  # anahtar başına eşzamanlı istek
+    KEY_RATE_LIMIT_COOLDOWN = int(os.getenv('KEY_RATE_LIMIT_COOLDOWN', '60'))  # 429 sonrası karantina (sn)
+    KEY_AUTH_COOLDOWN = int(os.getenv('KEY_AUTH_COOLDOWN', '3600'))  # 401 sonrası karantina (sn)
+    KEY_ACQUIRE_TIMEOUT = float(os.getenv('KEY_ACQUIRE_TIMEOUT', '5'))  # boş anahtar için en fazla bekleme (sn)
+    
+    @staticmethod
+    def api_keys(provider):
+        """Sağlayıcı için tekilleştirilmiş anahtar listesi"""
+        if provider == 'openai':
+            keys = [Config.OPENAI_API_KEY] + Config.OPENAI_API_KEYS
+        elif provider == 'gemini':
+            keys = [Config.GEMINI_API_KEY] + Config.GEMINI_API_KEYS
+        elif provider == 'local':
+            # Yerel sunucu genelde anahtar istemez, havuz için tek giriş yeterli
+            keys = [Config.LOCAL_API_KEY or 'local']
+        else:
+            keys = []
+        return list(dict.fromkeys(k for k in keys if k))
+    
+    # Kendi sunucumuzdaki OpenAI uyumlu model (AI_PROVIDER=local veya ön eleme için)
+    LOCAL_BASE_URL = os.getenv('LOCAL_BASE_URL', 'http://localhost:8000/v1')
+    LOCAL_MODEL = os.getenv('LOCAL_MODEL', 'qwen2.5-7b-instruct')
+    LOCAL_API_KEY = os.getenv('LOCAL_API_KEY', '')
+    LOCAL_MAX_IN_FLIGHT = int(os.getenv('LOCAL_MAX_IN_FLIGHT', '4'))  # eşzamanlı batch
+    LOCAL_TIMEOUT = int(os.getenv('LOCAL_TIMEOUT', '120'))  # saniye
+    # Ön eleme: yerel model her postu puanlar, sadece sınırdakiler barındırılan modele gider
+    LOCAL_SCREENING = os.getenv('LOCAL_SCREENING', 'false').lower() == 'true'
+    SCREEN_ESCALATE_MIN = int(os.getenv('SCREEN_ESCALATE_MIN', '4'))  # altı elenir
+    SCREEN_ACCEPT_SCORE = int(os.getenv('SCREEN_ACCEPT_SCORE', '9'))  # üstü doğrudan kabul
+    
+    # Token fiyatları (USD / 1M token) - maliyet takibi için
+    LLM_INPUT_PRICE = float(os.getenv('LLM_INPUT_PRICE', '0.15'))
+    LLM_OUTPUT_PRICE = float(os.getenv('LLM_OUTPUT_PRICE', '0.60'))
     
     # Batch Ayarları
     BATCH_SIZE = int(os.getenv('BATCH_SIZE', '5'))
@@ -48,6 +99,17 @@ class Config:
     SCAN_INTERVAL = int(os.getenv('SCAN_INTERVAL', '60'))  # saniye
     API_COOLDOWN = int(os.getenv('API_COOLDOWN', '5'))  # API istekleri arası bekleme
     
+    # Analiz Modu: "live" (anlık) veya "batch" (OpenAI Batch API, ucuz ve gecikmeli)
+    ANALYSIS_MODE = os.getenv('ANALYSIS_MODE', 'live').lower()
+    BATCH_API_DIR = os.getenv('BATCH_API_DIR', 'batch_jobs')
+    BATCH_API_KEY = os.getenv('BATCH_API_KEY')  # boşsa havuzdaki ilk anahtar kullanılır
+    BATCH_API_BASE_URL = os.getenv('BATCH_API_BASE_URL')  # yerel test sunucusu için
+    BATCH_API_MIN_REQUESTS = int(os.getenv('BATCH_API_MIN_REQUESTS', '20'))  # iş başına min. batch
+    BATCH_API_POLL_INTERVAL = int(os.getenv('BATCH_API_POLL_INTERVAL', '300'))  # saniye
+    BATCH_API_PRICE_FACTOR = float(os.getenv('BATCH_API_PRICE_FACTOR', '0.5'))  # Batch API indirimi
+    BATCH_API_MAX_ATTEMPTS = int(os.getenv('BATCH_API_MAX_ATTEMPTS', '3'))  # batch başına gönderim denemesi
+    BATCH_API_MAX_WAIT = int(os.getenv('BATCH_API_MAX_WAIT', '3600'))  # kuyruktaki en eski batch için saniye
+    
     # Hedef Subredditler
     TARGET_SUBREDDITS = [
         "SaaS", "Entrepreneur", "smallbusiness", 
@@ -61,6 +123,64 @@ class Config:
         "idea", "frustrated", "recommend", "suggestion", "advice"
     ]
     
+    # Öncelikli Analiz Kuyruğu
+    # Güçlü sinyaller yüksek, genel kelimeler düşük ağırlık alır (listede olmayanlar 1.0)
+    KEYWORD_WEIGHTS = {
+        "alternative to": 3.0, "need tool": 3.0, "looking for": 2.0, "wish": 2.0,
+        "hate": 2.0, "frustrated": 2.0, "expensive": 2.0, "manual": 2.0,
+        "how do i": 1.5, "pain": 1.5, "recommend": 1.0, "suggestion": 1.0,
+        "help": 0.5, "idea": 0.5, "advice": 0.5
+    }
+    SUBREDDIT_WEIGHTS = {
+        "SaaS": 1.2, "microsaas": 1.3, "smallbusiness": 1.1, "Entrepreneur": 1.0,
+        "startups": 1.0, "sideproject": 0.9, "marketing": 0.8
+    }
+    EXPRESS_PRIORITY = float(os.getenv('EXPRESS_PRIORITY', '6.0'))  # bu puan üstü hızlı şeride girer
+    EXPRESS_BATCH_SIZE = int(os.getenv('EXPRESS_BATCH_SIZE', '2'))
+    MAX_QUEUE_SIZE = int(os.getenv('MAX_QUEUE_SIZE', '100'))  # taşarsa en düşük öncelikliler atılır
+    MAX_QUEUE_AGE = int(os.getenv('MAX_QUEUE_AGE', '86400'))  # saniye, eski postlar kuyruktan düşer
+    HOURLY_BATCH_BUDGET = int(os.getenv('HOURLY_BATCH_BUDGET', '0'))  # saatlik AI çağrı limiti (0 = sınırsız)
+    LOW_PRIORITY_CUTOFF = float(os.getenv('LOW_PRIORITY_CUTOFF', '2.0'))  # kota baskısında bunun altı atılır
+    
+    # Anlık Yayın (SSE / Webhook)
+    EVENT_SERVER_HOST = os.getenv('EVENT_SERVER_HOST', '127.0.0.1')
+    EVENT_SERVER_PORT = int(os.getenv('EVENT_SERVER_PORT', '0'))  # 0 = SSE sunucusu kapalı
+    WEBHOOK_URLS = [u.strip() for u in os.getenv('WEBHOOK_URLS', '').split(',') if u.strip()]
+    EVENT_QUEUE_SIZE = int(os.getenv('EVENT_QUEUE_SIZE', '100'))  # tüketici başına, dolunca en eski atılır
+    EVENT_HISTORY_SIZE = int(os.getenv('EVENT_HISTORY_SIZE', '200'))
+    WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', '20'))
+    WEBHOOK_BATCH_WINDOW = float(os.getenv('WEBHOOK_BATCH_WINDOW', '0.25'))  # saniye
+    WEBHOOK_MAX_RETRIES = int(os.getenv('WEBHOOK_MAX_RETRIES', '4'))
+    
+    # Ham Post Arşivi (tüm çekilen postlar, offline keyword/prompt denemeleri için)
+    ARCHIVE_ENABLED = os.getenv('ARCHIVE_ENABLED', 'false').lower() == 'true'
+    ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', 'arsiv')
+    ARCHIVE_BLOCK_SIZE = min(int(os.getenv('ARCHIVE_BLOCK_SIZE', '200')), 65535)  # blok başına post
+    ARCHIVE_ZSTD_LEVEL = int(os.getenv('ARCHIVE_ZSTD_LEVEL', '10'))
+    
+    # Etkileşim Takibi (/api/info ile toplu upvote/yorum güncellemesi)
+    TRACKING_ENABLED = os.getenv('TRACKING_ENABLED', 'false').lower() == 'true'
+    TRACKING_DB = os.getenv('TRACKING_DB', 'takip.db')
+    TRACKING_REFRESH_FACTOR = float(os.getenv('TRACKING_REFRESH_FACTOR', '0.25'))  # aralık = yaş * faktör
+    TRACKING_MIN_INTERVAL = int(os.getenv('TRACKING_MIN_INTERVAL', '600'))  # saniye
+    TRACKING_MAX_INTERVAL = int(os.getenv('TRACKING_MAX_INTERVAL', '86400'))  # saniye
+    TRACKING_MAX_AGE = int(os.getenv('TRACKING_MAX_AGE', str(30 * 86400)))  # bu yaştan sonra takip bırakılır
+    TRACKING_MAX_REQUESTS = int(os.getenv('TRACKING_MAX_REQUESTS', '3'))  # tur başına /api/info isteği
+    
+    # Keyword Verim Analizi ve Budama
+    KEYWORD_STATS_FILE = os.getenv('KEYWORD_STATS_FILE', 'keyword_stats.json')
+    KEYWORD_PRUNING = os.getenv('KEYWORD_PRUNING', 'off').lower()  # off | demote | disable
+    KEYWORD_MIN_YIELD = float(os.getenv('KEYWORD_MIN_YIELD', '50'))  # dolar başına min. fırsat
+    KEYWORD_MIN_SAMPLES = int(os.getenv('KEYWORD_MIN_SAMPLES', '30'))  # karar için min. tek başına analiz
+    KEYWORD_DEMOTE_FACTOR = float(os.getenv('KEYWORD_DEMOTE_FACTOR', '0.25'))
+    KEYWORD_PROBATION_RATE = float(os.getenv('KEYWORD_PROBATION_RATE', '0.05'))  # kapalı keyword'lerden örnekleme oranı
+    
+    # Kolon Bazlı (Parquet) Dışa Aktarım - analiz notebook'ları için
+    PARQUET_ENABLED = os.getenv('PARQUET_ENABLED', 'false').lower() == 'true'
+    PARQUET_DIR = os.getenv('PARQUET_DIR', 'parquet')
+    PARQUET_FLUSH_ROWS = int(os.getenv('PARQUET_FLUSH_ROWS', '200'))
+    PARQUET_FLUSH_INTERVAL = int(os.getenv('PARQUET_FLUSH_INTERVAL', '3600'))  # saniye
+    
     # HTTP Header
     HEADERS = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
@@ -68,25 +188,180 @@ class Config:
     
     # Çıktı dosyası
     OUTPUT_FILE = 'firsatlar.csv'
+    
+    # Fırsat Kümeleme / Trend Ayarları
+    CLUSTER_ENABLED = os.getenv('CLUSTER_ENABLED', 'false').lower() == 'true'
+    CLUSTER_FILE = os.getenv('CLUSTER_FILE', 'kumeler.json')
+    CLUSTER_THRESHOLD = float(os.getenv('CLUSTER_THRESHOLD', '0.45'))  # kosinüs benzerliği
+    CLUSTER_DIM = int(os.getenv('CLUSTER_DIM', '1024'))  # hash vektör boyutu
+    CLUSTER_MAX_TERMS = int(os.getenv('CLUSTER_MAX_TERMS', '128'))  # merkez vektöründe tutulan boyut
+    CLUSTER_SAVE_INTERVAL = int(os.getenv('CLUSTER_SAVE_INTERVAL', '300'))  # saniye
+    TREND_WINDOW_DAYS = int(os.getenv('TREND_WINDOW_DAYS', '7'))
+
+
+class APIKeyPool:
+    """Sağlayıcı başına API anahtar havuzu - kota takibi, en az yüklü seçim ve karantina"""
+    
+    def __init__(self, provider, keys, client_factory, max_in_flight=None, rpm_limit=None):
+        self.provider = provider
+        self.max_in_flight = max_in_flight or Config.KEY_MAX_IN_FLIGHT
+        self.rpm_limit = Config.KEY_RPM_LIMIT if rpm_limit is None else rpm_limit  # 0 = sınırsız
+        self._cond = threading.Condition()
+        self.entries = [
+            {
+                "name": f"{provider}#{i} (...{key[-4:]})",
+                "client": client_factory(key),
+                "in_flight": 0,
+                "recent": deque(),  # son 60 sn'deki istek zamanları
+                "calls": 0,
+                "errors": 0,
+                "quarantined_until": 0.0
+            }
+            for i, key in enumerate(keys)
+        ]
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def _available(self, entry, now):
+        """Anahtar şu an istek alabilir mi?"""
+        recent = entry['recent']
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+        return (
+            entry['quarantined_until'] <= now
+            and entry['in_flight'] < self.max_in_flight
+            and (not self.rpm_limit or len(recent) < self.rpm_limit)
+        )
+    
+    def acquire(self, timeout=None):
+        """En az yüklü uygun anahtarı al; `timeout` içinde boşalmazsa None döndür"""
+        timeout = Config.KEY_ACQUIRE_TIMEOUT if timeout is None else timeout
+        deadline = time.time() + timeout
+        
+        with self._cond:
+            while True:
+                now = time.time()
+                candidates = [e for e in self.entries if self._available(e, now)]
+                if candidates:
+                    entry = min(candidates, key=lambda e: (e['in_flight'], len(e['recent'])))
+                    entry['in_flight'] += 1
+                    entry['recent'].append(now)
+                    entry['calls'] += 1
+                    return entry
+                
+                # Tüm anahtarlar süre dolduktan sonra açılacaksa hiç bekleme (tarama döngüsü bloklanmasın)
+                if all(e['quarantined_until'] > deadline for e in self.entries) or now >= deadline:
+                    return None
+                
+                # Meşgul/kotası dolu anahtar boşalana ya da süre bitene kadar bekle
+                wake_times = [e['recent'][0] + 60 for e in self.entries if e['recent']]
+                wait = min(wake_times) - now if wake_times else deadline - now
+                self._cond.wait(timeout=max(min(wait, deadline - now), 0.05))
+    
+    def release(self, entry, error=None):
+        """Anahtarı havuza geri ver; 401/429 hatalarında karantinaya al"""
+        with self._cond:
+            entry['in_flight'] -= 1
+            if error is not None:
+                entry['errors'] += 1
+                status = self.error_status(error)
+                if status == 401:
+                    entry['quarantined_until'] = time.time() + Config.KEY_AUTH_COOLDOWN
+                    print(f"🔒 {entry['name']} yetkisiz (401), karantinaya alındı.", flush=True)
+                elif status == 429:
+                    entry['quarantined_until'] = time.time() + Config.KEY_RATE_LIMIT_COOLDOWN
+                    print(f"⏳ {entry['name']} kota aşıldı (429), {Config.KEY_RATE_LIMIT_COOLDOWN} sn karantina.", flush=True)
+            self._cond.notify_all()
+    
+    @staticmethod
+    def error_status(error):
+        """SDK istisnasından HTTP durum kodunu çıkar (sadece sayısal alanlara güvenilir)"""
+        for attr in ('status_code', 'code', 'status'):
+            value = getattr(error, attr, None)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
+        return None
+
+
+class LocalModelClient:
+    """OpenAI uyumlu self-hosted model sunucusu için hafif HTTP istemcisi (bağlantı yeniden kullanımlı)"""
+    
+    def __init__(self, api_key=None, base_url=None, session=None):
+        self.base_url = (base_url or Config.LOCAL_BASE_URL).rstrip('/')
+        # Tek Session: keep-alive ile TCP bağlantıları eşzamanlı batch'ler arasında paylaşılır
+        # (session dışarıdan verilebilir, ör. testte sahte sunucu istemcisi)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=Config.LOCAL_MAX_IN_FLIGHT)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self.headers = {"Content-Type": "application/json"}
+        if api_key and api_key != 'local':
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.json_mode = True  # sunucu response_format desteklemiyorsa kapatılır
+    
+    def chat(self, body):
+        """/chat/completions isteği at, yanıtı sözlük olarak döndür"""
+        if not self.json_mode:
+            body = {k: v for k, v in body.items() if k != 'response_format'}
+        
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            json=body, headers=self.headers, timeout=Config.LOCAL_TIMEOUT
+        )
+        
+        # response_format desteklenmiyor olabilir: prompt'taki JSON talimatına güvenerek bir kez
+        # daha dene. JSON modu sadece hata response_format'tan bahsediyorsa ya da tekrar deneme
+        # başarılıysa kapatılır (ör. "context length exceeded" JSON modunu etkilemez)
+        if response.status_code in (400, 422) and 'response_format' in body:
+            plain_body = {k: v for k, v in body.items() if k != 'response_format'}
+            retry = self.session.post(
+                f"{self.base_url}/chat/completions",
+                json=plain_body, headers=self.headers, timeout=Config.LOCAL_TIMEOUT
+            )
+            if retry.status_code == 200 or 'response_format' in response.text:
+                if self.json_mode:
+                    print("ℹ️ Yerel sunucu response_format desteklemiyor, düz JSON ayrıştırmaya geçiliyor.")
+                    self.json_mode = False
+                response = retry
+        
+        if response.status_code != 200:
+            error = RuntimeError(f"Yerel model HTTP {response.status_code}: {response.text[:200]}")
+            error.status_code = response.status_code
+            raise error
+        return response.json()
 
 
 class AIAnalyzer:
     """AI analiz sınıfı - OpenAI ve Gemini desteği"""
     
-    def __init__(self):
-        self.provider = Config.AI_PROVIDER
+    def __init__(self, provider=None):
+        self.provider = provider or Config.AI_PROVIDER
         self._setup_client()
     
     def _setup_client(self):
-        """AI istemcisini başlat"""
+        """AI istemci havuzunu başlat"""
+        keys = Config.api_keys(self.provider)
+        
+        if self.provider == 'local':
+            self.pool = APIKeyPool(
+                'local', keys, LocalModelClient,
+                max_in_flight=Config.LOCAL_MAX_IN_FLIGHT, rpm_limit=0
+            )
+            self.model = Config.LOCAL_MODEL
+            print(f"✅ Yerel model bağlantısı hazır ({Config.LOCAL_BASE_URL}, Model: {self.model})")
+            return
+        
         if self.provider == 'openai':
             try:
                 from openai import OpenAI
-                if not Config.OPENAI_API_KEY:
+                if not keys:
                     raise ValueError("OPENAI_API_KEY bulunamadı!")
-                self.client = OpenAI(api_key=Config.OPENAI_API_KEY)
+                self.pool = APIKeyPool('openai', keys, lambda key: OpenAI(api_key=key))
                 self.model = Config.OPENAI_MODEL
-                print(f"✅ OpenAI bağlantısı kuruldu (Model: {self.model})")
+                print(f"✅ OpenAI bağlantısı kuruldu (Model: {self.model}, Anahtar: {len(self.pool)})")
             except ImportError:
                 print("❌ openai paketi yüklü değil! 'pip install openai' çalıştırın.")
                 sys.exit(1)
@@ -94,37 +369,90 @@ class AIAnalyzer:
         elif self.provider == 'gemini':
             try:
                 from google import genai
-                if not Config.GEMINI_API_KEY:
+                if not keys:
                     raise ValueError("GEMINI_API_KEY bulunamadı!")
-                self.client = genai.Client(api_key=Config.GEMINI_API_KEY)
+                self.pool = APIKeyPool('gemini', keys, lambda key: genai.Client(api_key=key))
                 self.model = Config.GEMINI_MODEL
-                print(f"✅ Gemini bağlantısı kuruldu (Model: {self.model})")
+                print(f"✅ Gemini bağlantısı kuruldu (Model: {self.model}, Anahtar: {len(self.pool)})")
             except ImportError:
                 print("❌ google-genai paketi yüklü değil! 'pip install google-genai' çalıştırın.")
                 sys.exit(1)
         else:
             raise ValueError(f"Geçersiz AI sağlayıcı: {self.provider}")
     
+    @property
+    def concurrency(self):
+        """Havuzun aynı anda taşıyabileceği batch sayısı"""
+        return len(self.pool) * self.pool.max_in_flight
+    
     def analyze_batch(self, posts_buffer):
-        """Biriken postları topluca analiz et"""
+        """Biriken postları topluca analiz et.
+        
+        Boş anahtar yoksa (hepsi karantinada/meşgul) ya da tüm denemeler 401/429 ile bittiyse
+        None döner; çağıran postları kuyrukta tutar.
+        """
         if not posts_buffer:
             return []
         
         print(f"\n⚡ {len(posts_buffer)} adet post AI'ya gönderiliyor...", flush=True)
         
         # Postları formatla
-        formatted_text = self._format_posts(posts_buffer)
-        prompt = self._create_prompt(len(posts_buffer), formatted_text)
+        prompt = self.build_prompt(posts_buffer)
         
-        try:
-            if self.provider == 'openai':
-                return self._analyze_with_openai(prompt)
-            else:
-                return self._analyze_with_gemini(prompt)
-        except Exception as e:
-            print(f"⚠️ AI Analiz Hatası: {e}")
-            time.sleep(10)
-            return []
+        # 401/429 alan anahtar karantinaya alınır, batch havuzdaki başka anahtarla tekrar denenir
+        for _ in range(len(self.pool)):
+            entry = self.pool.acquire()
+            if entry is None:
+                print("⏳ Kullanılabilir API anahtarı yok, batch sonraki tura ertelendi.", flush=True)
+                return None
+            try:
+                if self.provider == 'openai':
+                    results, usage = self._analyze_with_openai(entry['client'], prompt)
+                elif self.provider == 'local':
+                    results, usage = self._analyze_with_local(entry['client'], prompt)
+                else:
+                    results, usage = self._analyze_with_gemini(entry['client'], prompt)
+            except Exception as e:
+                self.pool.release(entry, e)
+                print(f"⚠️ AI Analiz Hatası ({entry['name']}): {e}")
+                if APIKeyPool.error_status(e) in (401, 429):
+                    continue
+                time.sleep(10)
+                return []
+            
+            self.pool.release(entry)
+            # Yerel modelin token maliyeti yok
+            self.annotate_usage(posts_buffer, usage, price_factor=0.0 if self.provider == 'local' else 1.0)
+            return results
+        # Tüm denemeler 401/429 ile bitti: batch analiz edilmedi, çağıran postları kuyruğa geri koysun
+        print("⏳ Tüm anahtarlar reddetti, batch sonraki tura ertelendi.", flush=True)
+        return None
+    
+    def annotate_usage(self, posts_buffer, usage, price_factor=1.0):
+        """Batch'in token/gecikme/maliyet bilgisini postlara eşit pay olarak ekle"""
+        prompt_tokens = usage.get('prompt_tokens') or 0
+        completion_tokens = usage.get('completion_tokens') or 0
+        cost = (
+            prompt_tokens * Config.LLM_INPUT_PRICE + completion_tokens * Config.LLM_OUTPUT_PRICE
+        ) / 1_000_000 * price_factor
+        
+        n = len(posts_buffer)
+        for post in posts_buffer:
+            post['telemetry'] = {
+                "model": self.model,
+                "tokens": round((prompt_tokens + completion_tokens) / n, 1),
+                "latency": usage.get('latency'),
+                "cost": cost / n
+            }
+    
+    def analyze_batches(self, batches):
+        """Birden fazla batch'i anahtar havuzu üzerinde paralel analiz et (sıra korunur)"""
+        if len(batches) <= 1:
+            return [self.analyze_batch(b) for b in batches]
+        
+        workers = min(len(batches), self.concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.analyze_batch, batches))
     
     def _format_posts(self, posts_buffer):
         """Postları metin formatına dönüştür"""
@@ -172,21 +500,75 @@ Kurallar:
 - JSON dışında HİÇBİR ŞEY yazma
 """
     
-    def _analyze_with_openai(self, prompt):
-        """OpenAI ile analiz"""
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
+    def openai_request_body(self, prompt):
+        """chat.completions isteği gövdesi (canlı ve Batch API modu ortak kullanır)"""
+        return {
+            "model": self.model,
+            "messages": [
                 {"role": "system", "content": "Sen bir JSON API'sisin. Sadece geçerli JSON döndür."},
                 {"role": "user", "content": prompt}
             ],
-            response_format={"type": "json_object"},
-            temperature=0.3
-        )
+            "response_format": {"type": "json_object"},
+            "temperature": 0.3
+        }
+    
+    def build_prompt(self, posts_buffer):
+        """Bir batch için tam prompt metni"""
+        return self._create_prompt(len(posts_buffer), self._format_posts(posts_buffer))
+    
+    def _analyze_with_openai(self, client, prompt):
+        """OpenAI ile analiz - (sonuçlar, kullanım) döndürür"""
+        started = time.time()
+        response = client.chat.completions.create(**self.openai_request_body(prompt))
+        usage = {
+            "prompt_tokens": getattr(response.usage, 'prompt_tokens', 0) if getattr(response, 'usage', None) else 0,
+            "completion_tokens": getattr(response.usage, 'completion_tokens', 0) if getattr(response, 'usage', None) else 0,
+            "latency": round(time.time() - started, 3)
+        }
         
         time.sleep(Config.API_COOLDOWN)
         
-        result = json.loads(response.choices[0].message.content)
+        return self.parse_openai_content(response.choices[0].message.content), usage
+    
+    def _analyze_with_local(self, client, prompt):
+        """OpenAI uyumlu yerel sunucu ile analiz - (sonuçlar, kullanım) döndürür"""
+        started = time.time()
+        data = client.chat(self.openai_request_body(prompt))
+        usage = data.get('usage') or {}
+        usage = {
+            "prompt_tokens": usage.get('prompt_tokens', 0),
+            "completion_tokens": usage.get('completion_tokens', 0),
+            "latency": round(time.time() - started, 3)
+        }
+        return self.parse_openai_content(data['choices'][0]['message']['content']), usage
+    
+    @staticmethod
+    def extract_json(text):
+        """Serbest metin yanıttan JSON'u ayıkla (response_format desteklenmediğinde)"""
+        text = text.strip()
+        if text.startswith('```'):
+            text = text.replace('```json', '').replace('```', '').strip()
+        try:
+            return json.loads(text)
+        except ValueError:
+            pass
+        
+        # Model JSON'un önüne/arkasına açıklama eklediyse ilk çözülebilen [ veya { noktasından
+        # itibaren tek bir JSON değeri oku, arkasındaki metni yok say
+        decoder = json.JSONDecoder()
+        for start, char in enumerate(text):
+            if char not in '[{':
+                continue
+            try:
+                return decoder.raw_decode(text, start)[0]
+            except ValueError:
+                continue
+        raise ValueError("Yanıtta JSON bulunamadı")
+    
+    @staticmethod
+    def parse_openai_content(content):
+        """OpenAI yanıt metnini sonuç listesine çevir"""
+        result = AIAnalyzer.extract_json(content)
         # OpenAI bazen {"results": [...]} formatında dönebilir
         if isinstance(result, dict) and "results" in result:
             return result["results"]
@@ -196,9 +578,41 @@ Kurallar:
             # Tek obje döndüyse listeye çevir
             return [result] if result else []
     
-    def _analyze_with_gemini(self, prompt):
-        """Gemini ile analiz (yeni google-genai SDK)"""
-        response = self.client.models.generate_content(
+    @staticmethod
+    def normalize_results(results):
+        """Sonuç alanlarını sayısal tiplere çevir (yerel modeller "9", null, "0" dönebilir).
+        
+        post_id'si sayıya çevrilemeyen satırlar atlanır, geçersiz puan 0 sayılır.
+        """
+        normalized = []
+        for res in results or []:
+            if not isinstance(res, dict):
+                continue
+            try:
+                post_id = int(float(res.get('post_id')))
+            except (TypeError, ValueError, OverflowError):
+                continue
+            try:
+                score = float(res.get('score') or 0)
+            except (TypeError, ValueError):
+                score = 0.0
+            if not math.isfinite(score):
+                score = 0.0
+            is_opportunity = res.get('is_opportunity')
+            if isinstance(is_opportunity, str):
+                is_opportunity = is_opportunity.strip().lower() in ('true', '1', 'yes')
+            normalized.append(dict(
+                res,
+                post_id=post_id,
+                score=int(score) if score.is_integer() else score,
+                is_opportunity=bool(is_opportunity)
+            ))
+        return normalized
+    
+    def _analyze_with_gemini(self, client, prompt):
+        """Gemini ile analiz (yeni google-genai SDK) - (sonuçlar, kullanım) döndürür"""
+        started = time.time()
+        response = client.models.generate_content(
             model=self.model,
             contents=prompt,
             config={
@@ -206,6 +620,12 @@ Kurallar:
                 "temperature": 0.3
             }
         )
+        meta = getattr(response, 'usage_metadata', None)
+        usage = {
+            "prompt_tokens": getattr(meta, 'prompt_token_count', 0) or 0,
+            "completion_tokens": getattr(meta, 'candidates_token_count', 0) or 0,
+            "latency": round(time.time() - started, 3)
+        }
         time.sleep(Config.API_COOLDOWN)
         
         # JSON parse
@@ -213,7 +633,944 @@ Kurallar:
         if text.startswith('```'):
             text = text.replace('```json', '').replace('```', '').strip()
         
-        return json.loads(text)
+        return json.loads(text), usage
+
+
+class ScreeningAnalyzer:
+    """Yerel model ile ön eleme: net sonuçlar yerelde kalır, sınırdakiler barındırılan modele gider"""
+    
+    def __init__(self, screener, hosted):
+        self.screener = screener
+        self.hosted = hosted
+    
+    def analyze_batches(self, batches):
+        """AIAnalyzer.analyze_batches ile aynı arayüz (post_id'ler orijinal batch'e göre)"""
+        local_results = self.screener.analyze_batches(batches)
+        final = [[] for _ in batches]
+        escalate = []  # (batch_idx, post_idx)
+        rejected = 0
+        
+        for b_idx, (batch, results) in enumerate(zip(batches, local_results)):
+            by_post = {r['post_id']: r for r in AIAnalyzer.normalize_results(results)}
+            for p_idx in range(len(batch)):
+                res = by_post.get(p_idx)
+                score = res['score'] if res else 0
+                if res is None:
+                    # Yerel model bu postu atladı/hata verdi: barındırılan modele bırak
+                    escalate.append((b_idx, p_idx))
+                elif res.get('is_opportunity') and score >= Config.SCREEN_ACCEPT_SCORE:
+                    final[b_idx].append(res)
+                elif score >= Config.SCREEN_ESCALATE_MIN:
+                    escalate.append((b_idx, p_idx))
+                else:
+                    final[b_idx].append({"post_id": p_idx, "is_opportunity": False})
+                    rejected += 1
+        
+        print(f"🧪 Ön eleme: {sum(len(b) for b in batches) - len(escalate) - rejected} kabul, "
+              f"{len(escalate)} yükseltildi, {rejected} elendi", flush=True)
+        if not escalate:
+            return final
+        
+        # Sınırdaki postları yeniden paketleyip barındırılan modele gönder
+        refs = [escalate[i:i + Config.BATCH_SIZE] for i in range(0, len(escalate), Config.BATCH_SIZE)]
+        hosted_batches = [[batches[b][p] for b, p in ref] for ref in refs]
+        for ref, results in zip(refs, self.hosted.analyze_batches(hosted_batches)):
+            if results is None:
+                # Barındırılan modelde anahtar yok: etkilenen batch'ler kuyrukta kalsın
+                for b_idx, _ in ref:
+                    final[b_idx] = None
+                continue
+            for res in AIAnalyzer.normalize_results(results):
+                idx = res['post_id']
+                if 0 <= idx < len(ref):
+                    b_idx, p_idx = ref[idx]
+                    if final[b_idx] is not None:
+                        final[b_idx].append(dict(res, post_id=p_idx))
+        return final
+
+
+class BatchOffloader:
+    """OpenAI Batch API ile çevrimdışı analiz - JSONL iş dosyası, gönderim ve sonuç toplama"""
+    
+    ENDPOINT = "/v1/chat/completions"
+    DONE_STATUSES = ("completed", "failed", "expired", "cancelled")
+    
+    def __init__(self, analyzer, client=None):
+        if analyzer.provider != 'openai':
+            raise ValueError("Batch modu şu an sadece OpenAI sağlayıcısını destekliyor!")
+        
+        self.analyzer = analyzer
+        # client dışarıdan verilebilir (ör. yerel test sunucusu / sahte istemci)
+        self.client = client or self._create_client()
+        self.state_file = os.path.join(Config.BATCH_API_DIR, 'state.json')
+        self.last_poll = 0.0
+        os.makedirs(Config.BATCH_API_DIR, exist_ok=True)
+        self._load()
+    
+    def _create_client(self):
+        """Batch işleri için ayrı OpenAI istemcisi (canlı havuzun kotasını paylaşmaz)"""
+        from openai import OpenAI
+        key = Config.BATCH_API_KEY or Config.api_keys('openai')[0]
+        if Config.BATCH_API_BASE_URL:
+            return OpenAI(api_key=key, base_url=Config.BATCH_API_BASE_URL)
+        return OpenAI(api_key=key)
+    
+    def _load(self):
+        """Bekleyen batch'leri ve açık işleri diskten yükle"""
+        # Kuyruk elemanları: {"posts": [...], "attempts": n, "queued_at": ts}
+        self.pending = []
+        self.jobs = {}
+        if os.path.isfile(self.state_file):
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            self.pending = [self._entry(b) for b in state.get('pending', [])]
+            self.jobs = state.get('jobs', {})
+            for job in self.jobs.values():
+                job['batches'] = [self._entry(b) for b in job['batches']]
+    
+    @staticmethod
+    def _entry(batch):
+        """Eski durum dosyalarındaki düz post listelerini deneme sayaçlı kayda çevir"""
+        return batch if isinstance(batch, dict) else {"posts": batch, "attempts": 0}
+    
+    def _save(self):
+        """Durumu diske yaz (yeniden başlatmada işler kaybolmasın)"""
+        tmp_path = self.state_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"pending": self.pending, "jobs": self.jobs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_file)
+    
+    def enqueue(self, batches):
+        """Batch'leri kuyruğa ekle, yeterince biriktiyse işi gönder"""
+        now = time.time()
+        self.pending.extend({"posts": batch, "attempts": 0, "queued_at": now} for batch in batches)
+        self._save()
+        print(f"🗂️ {len(batches)} batch Batch API kuyruğuna eklendi ({len(self.pending)}/{Config.BATCH_API_MIN_REQUESTS}).", flush=True)
+        
+        if len(self.pending) >= Config.BATCH_API_MIN_REQUESTS:
+            self.submit()
+    
+    def submit(self):
+        """Bekleyen batch'leri JSONL dosyasına yazıp Batch API'ye gönder"""
+        if not self.pending:
+            return None
+        
+        path = os.path.join(Config.BATCH_API_DIR, f"input_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        with open(path, 'w', encoding='utf-8') as f:
+            for i, entry in enumerate(self.pending):
+                line = {
+                    "custom_id": f"batch-{i}",
+                    "method": "POST",
+                    "url": self.ENDPOINT,
+                    "body": self.analyzer.openai_request_body(self.analyzer.build_prompt(entry['posts']))
+                }
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+        
+        try:
+            with open(path, 'rb') as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            job = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=self.ENDPOINT,
+                completion_window="24h"
+            )
+        except Exception as e:
+            print(f"⚠️ Batch API gönderim hatası: {e} (batch'ler kuyrukta bekliyor)")
+            return None
+        
+        for entry in self.pending:
+            entry['attempts'] += 1
+        self.jobs[job.id] = {
+            "batches": self.pending,
+            "input_file": path,
+            "submitted_at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "submitted_ts": time.time()
+        }
+        print(f"📤 Batch işi gönderildi: {job.id} ({len(self.pending)} batch)", flush=True)
+        self.pending = []
+        self._save()
+        return job.id
+    
+    def _submit_stale(self):
+        """Eşik dolmasa da BATCH_API_MAX_WAIT'ten uzun bekleyen batch'leri gönder (backfill sonu)"""
+        if not self.pending:
+            return
+        oldest = min(e.get('queued_at', 0) for e in self.pending)
+        if time.time() - oldest >= Config.BATCH_API_MAX_WAIT:
+            print(f"⏰ {len(self.pending)} batch uzun süredir bekliyor, eşik beklenmeden gönderiliyor.", flush=True)
+            self.submit()
+    
+    def poll(self, force=False):
+        """Biten işlerin sonuçlarını (batches, batch_results) çiftleri olarak döndür"""
+        self._submit_stale()
+        if not self.jobs:
+            return []
+        if not force and time.time() - self.last_poll < Config.BATCH_API_POLL_INTERVAL:
+            return []
+        self.last_poll = time.time()
+        
+        finished = []
+        requeued = False
+        for job_id in list(self.jobs):
+            try:
+                job = self.client.batches.retrieve(job_id)
+            except Exception as e:
+                print(f"⚠️ Batch durumu alınamadı ({job_id}): {e}")
+                continue
+            
+            if job.status not in self.DONE_STATUSES:
+                continue
+            
+            entries = self.jobs[job_id]['batches']
+            outputs = self._download(getattr(job, 'output_file_id', None))
+            self._log_errors(job)
+            
+            done, missing = [], []
+            for i, entry in enumerate(entries):
+                results, usage = outputs.get(f"batch-{i}", (None, None))
+                if results is None:
+                    missing.append(entry)
+                    continue
+                # Gecikme = gönderimden tamamlanmaya kadar geçen süre
+                usage['latency'] = round(time.time() - self.jobs[job_id].get('submitted_ts', time.time()), 3)
+                self.analyzer.annotate_usage(entry['posts'], usage, price_factor=Config.BATCH_API_PRICE_FACTOR)
+                done.append((entry['posts'], results))
+            
+            # Sonucu gelmeyen batch'ler deneme hakkı bitene kadar tekrar kuyruğa alınır
+            retry = [e for e in missing if e['attempts'] < Config.BATCH_API_MAX_ATTEMPTS]
+            if retry:
+                print(f"⚠️ Batch işi {job_id} ({job.status}): {len(retry)} batch yeniden kuyruğa alındı.")
+                self.pending.extend(retry)
+                requeued = True
+            if len(missing) > len(retry):
+                print(f"❌ Batch işi {job_id}: {len(missing) - len(retry)} batch "
+                      f"{Config.BATCH_API_MAX_ATTEMPTS} denemede başarısız oldu, atlanıyor.")
+            
+            print(f"📥 Batch işi bitti: {job_id} ({job.status}, {len(done)}/{len(entries)} batch sonuçlandı)", flush=True)
+            if done:
+                finished.append(([b for b, _ in done], [r for _, r in done]))
+            del self.jobs[job_id]
+            self._save()
+        
+        # Tekrar denenecek batch'ler yeni enqueue çağrılarını beklemeden hemen gönderilir
+        if requeued:
+            self.submit()
+        return finished
+    
+    def _log_errors(self, job):
+        """İş seviyesindeki (ör. girdi doğrulama) ve satır bazlı hataların sebebini yazdır"""
+        errors = getattr(job, 'errors', None)
+        for err in (getattr(errors, 'data', None) or [])[:5]:
+            print(f"   ↳ {getattr(err, 'code', '')}: {getattr(err, 'message', err)}")
+        
+        file_id = getattr(job, 'error_file_id', None)
+        if not file_id:
+            return
+        try:
+            content = self.client.files.content(file_id).text
+        except Exception as e:
+            print(f"⚠️ Batch hata dosyası okunamadı ({file_id}): {e}")
+            return
+        
+        lines = [line for line in content.splitlines() if line.strip()]
+        for line in lines[:5]:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                print(f"   ↳ (çözümlenemeyen satır) {line[:200]}")
+                continue
+            if not isinstance(item, dict):
+                continue
+            body = (item.get('response') or {}).get('body') or {}
+            error = item.get('error') or body.get('error') or {}
+            print(f"   ↳ {item.get('custom_id')}: {error.get('message', error)}")
+        if len(lines) > 5:
+            print(f"   ↳ ... ve {len(lines) - 5} hata daha")
+    
+    def _download(self, file_id):
+        """Çıktı JSONL dosyasını indirip custom_id -> (sonuç listesi, kullanım) sözlüğüne çevir"""
+        if not file_id:
+            return {}
+        
+        outputs = {}
+        content = self.client.files.content(file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                print(f"⚠️ Batch çıktı satırı çözümlenemedi: {line[:200]}")
+                continue
+            if not isinstance(item, dict):
+                continue
+            response = item.get('response') or {}
+            if response.get('status_code') != 200:
+                continue
+            try:
+                message = response['body']['choices'][0]['message']['content']
+                usage = response['body'].get('usage') or {}
+                outputs[item['custom_id']] = (
+                    self.analyzer.parse_openai_content(message),
+                    {"prompt_tokens": usage.get('prompt_tokens', 0), "completion_tokens": usage.get('completion_tokens', 0)}
+                )
+            except (KeyError, IndexError, ValueError) as e:
+                print(f"⚠️ Batch sonucu çözümlenemedi ({item.get('custom_id')}): {e}")
+        return outputs
+
+
+class AnalysisQueue:
+    """Tahmini değer ve tazeliğe göre sıralanan analiz kuyruğu (FIFO buffer yerine)"""
+    
+    def __init__(self):
+        self._heap = []
+        self._seq = 0
+        self.dropped = 0
+        self.budget_calls = deque()  # son 1 saatte yapılan AI çağrıları
+    
+    def __len__(self):
+        return len(self._heap)
+    
+    @staticmethod
+    def priority(post_data, keywords, weights=None):
+        """Yerel sinyallerden ucuz öncelik puanı: keyword gücü, etkileşim hızı, subreddit, yaş"""
+        weights = weights if weights is not None else Config.KEYWORD_WEIGHTS
+        kw_strength = min(sum(weights.get(kw, 1.0) for kw in keywords), 6.0)
+        
+        created = post_data.get('created_utc') or time.time()
+        age_hours = max((time.time() - created) / 3600, 0.25)
+        engagement = post_data.get('ups', 0) + 2 * post_data.get('num_comments', 0)
+        velocity = math.log1p(max(engagement, 0) / age_hours)
+        freshness = 1 / (1 + age_hours / 6)
+        
+        sub_weight = Config.SUBREDDIT_WEIGHTS.get(post_data.get('subreddit'), 1.0)
+        return round((kw_strength + velocity) * sub_weight * (0.5 + freshness), 3)
+    
+    def push(self, post):
+        """Postu öncelik sırasıyla kuyruğa ekle"""
+        self._seq += 1
+        heapq.heappush(self._heap, (-post['priority'], self._seq, post))
+        self._prune()
+    
+    def rescore(self, weights=None):
+        """Bekleyen postların önceliğini yeniden hesapla (tazelik ve hız zamanla düşer)"""
+        rescored = []
+        for _, seq, post in self._heap:
+            post['priority'] = self.priority(post, post['keywords'], weights)
+            rescored.append((-post['priority'], seq, post))
+        self._heap = rescored
+        heapq.heapify(self._heap)
+        self._prune()
+    
+    def _prune(self):
+        """Eski postları ve kapasite aşımında en düşük öncelikli olanları at"""
+        now = time.time()
+        kept = [
+            item for item in self._heap
+            if now - (item[2].get('created_utc') or item[2]['queued_at']) <= Config.MAX_QUEUE_AGE
+        ]
+        kept.sort()
+        dropped = len(self._heap) - len(kept[:Config.MAX_QUEUE_SIZE])
+        if dropped:
+            self._heap = kept[:Config.MAX_QUEUE_SIZE]
+            heapq.heapify(self._heap)
+            self.dropped += dropped
+    
+    def top_priority(self):
+        """En yüksek öncelik puanı (kuyruk boşsa 0)"""
+        return -self._heap[0][0] if self._heap else 0.0
+    
+    def pop(self, count):
+        """En öncelikli `count` postu kuyruktan çıkar"""
+        return [heapq.heappop(self._heap)[2] for _ in range(min(count, len(self._heap)))]
+    
+    def pop_express(self):
+        """Hızlı şeritteki (EXPRESS_PRIORITY üstü) postları küçük bir batch olarak çıkar"""
+        posts = []
+        while self._heap and len(posts) < Config.EXPRESS_BATCH_SIZE and self.top_priority() >= Config.EXPRESS_PRIORITY:
+            posts.append(heapq.heappop(self._heap)[2])
+        return posts
+    
+    def budget_left(self):
+        """Bu saat için kalan AI çağrı hakkı (limitsizse None)"""
+        if not Config.HOURLY_BATCH_BUDGET:
+            return None
+        now = time.time()
+        while self.budget_calls and now - self.budget_calls[0] > 3600:
+            self.budget_calls.popleft()
+        return Config.HOURLY_BATCH_BUDGET - len(self.budget_calls)
+    
+    def spend(self, calls):
+        """AI çağrılarını bütçeden düş"""
+        now = time.time()
+        self.budget_calls.extend([now] * calls)
+    
+    def shed_low_priority(self):
+        """Kota baskısı altında düşük öncelikli postları at"""
+        kept = [item for item in self._heap if -item[0] >= Config.LOW_PRIORITY_CUTOFF]
+        dropped = len(self._heap) - len(kept)
+        if dropped:
+            self._heap = kept
+            heapq.heapify(self._heap)
+            self.dropped += dropped
+        return dropped
+
+
+class PostArchive:
+    """Çekilen tüm postların sadece-ekleme (append-only) sıkıştırılmış arşivi + ters indeks"""
+    
+    TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+    CODEC_ZLIB, CODEC_ZSTD = 0, 1
+    
+    def __init__(self, directory=None):
+        self.directory = directory or Config.ARCHIVE_DIR
+        os.makedirs(self.directory, exist_ok=True)
+        self.data_path = os.path.join(self.directory, 'posts.dat')
+        self.db = sqlite3.connect(os.path.join(self.directory, 'index.db'))
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS blocks (
+                block INTEGER PRIMARY KEY, offset INTEGER, length INTEGER,
+                codec INTEGER, first_doc INTEGER, count INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS tokens (id INTEGER PRIMARY KEY, token TEXT UNIQUE, df INTEGER DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS postings (
+                token_id INTEGER, block INTEGER, docs BLOB,
+                PRIMARY KEY (token_id, block)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS posts (id TEXT PRIMARY KEY, block INTEGER, local_id INTEGER) WITHOUT ROWID;
+        """)
+        self.buffer = []
+        self._buffer_ids = set()
+        self._block_cache = {}
+        self._setup_codec()
+        self._migrate()
+        
+        row = self.db.execute("SELECT MAX(block), MAX(first_doc + count) FROM blocks").fetchone()
+        self.next_block = (row[0] + 1) if row[0] is not None else 0
+        self.next_doc = row[1] or 0
+    
+    def _migrate(self):
+        """Eski indekslere df kolonunu ve arşivlenmiş post id tablosunu ekle"""
+        has_posts = self.db.execute("SELECT 1 FROM posts LIMIT 1").fetchone()
+        if not has_posts:
+            # Yeniden başlatmalarda aynı postlar tekrar arşivlenmesin diye mevcut id'leri kaydet
+            blocks = self.db.execute("SELECT block FROM blocks ORDER BY block").fetchall()
+            with self.db:
+                for (block,) in blocks:
+                    self.db.executemany(
+                        "INSERT OR IGNORE INTO posts VALUES (?, ?, ?)",
+                        ((p['id'], block, i) for i, p in enumerate(self._read_block(block)) if p.get('id'))
+                    )
+            self._block_cache = {}
+        
+        columns = [r[1] for r in self.db.execute("PRAGMA table_info(tokens)")]
+        if 'df' in columns:
+            return
+        with self.db:
+            self.db.execute("ALTER TABLE tokens ADD COLUMN df INTEGER DEFAULT 0")
+            # Postings blob'u 2 baytlık blok içi sıra numaralarından oluşuyor
+            self.db.execute(
+                "UPDATE tokens SET df = (SELECT COALESCE(SUM(length(docs)), 0) / 2 "
+                "FROM postings WHERE token_id = tokens.id)"
+            )
+    
+    def _setup_codec(self):
+        """zstd varsa onu, yoksa zlib kullan (her blok kendi codec'ini kaydeder)"""
+        try:
+            import zstandard
+            self.codec = self.CODEC_ZSTD
+            self._zstd_c = zstandard.ZstdCompressor(level=Config.ARCHIVE_ZSTD_LEVEL)
+            self._zstd_d = zstandard.ZstdDecompressor()
+        except ImportError:
+            print("⚠️ zstandard paketi yüklü değil, arşiv zlib ile sıkıştırılacak. ('pip install zstandard')")
+            self.codec = self.CODEC_ZLIB
+            self._zstd_c = self._zstd_d = None
+    
+    @classmethod
+    def tokenize(cls, text):
+        return set(cls.TOKEN_RE.findall(text.lower()))
+    
+    def contains(self, post_id):
+        """Post daha önce arşivlendi mi (buffer dahil)"""
+        if post_id in self._buffer_ids:
+            return True
+        return self.db.execute("SELECT 1 FROM posts WHERE id = ?", (post_id,)).fetchone() is not None
+    
+    def add(self, post_data):
+        """Ham postu arşiv buffer'ına ekle, blok dolunca diske yaz (arşivdekiler atlanır)"""
+        post_id = post_data.get('id')
+        if post_id and self.contains(post_id):
+            return False
+        if post_id:
+            self._buffer_ids.add(post_id)
+        self.buffer.append({
+            "id": post_id,
+            "subreddit": post_data.get('subreddit'),
+            "title": post_data.get('title', ''),
+            "selftext": post_data.get('selftext', ''),
+            "permalink": post_data.get('permalink'),
+            "created_utc": post_data.get('created_utc'),
+            "ups": post_data.get('ups', 0),
+            "num_comments": post_data.get('num_comments', 0),
+            "fetched_at": int(time.time())
+        })
+        if len(self.buffer) >= Config.ARCHIVE_BLOCK_SIZE:
+            self.flush()
+        return True
+    
+    def flush(self):
+        """Buffer'daki postları sıkıştırılmış blok olarak ekle ve indeksle"""
+        if not self.buffer:
+            return
+        
+        raw = "\n".join(json.dumps(p, ensure_ascii=False) for p in self.buffer).encode('utf-8')
+        if self.codec == self.CODEC_ZSTD:
+            compressed = self._zstd_c.compress(raw)
+        else:
+            compressed = zlib.compress(raw, 9)
+        
+        with open(self.data_path, 'ab') as f:
+            offset = f.tell()
+            f.write(compressed)
+        
+        # Blok içi ters indeks: token -> blok içi sıra numaraları
+        block_postings = {}
+        for local_id, post in enumerate(self.buffer):
+            for token in self.tokenize(f"{post['title']} {post['selftext']}"):
+                block_postings.setdefault(token, []).append(local_id)
+        
+        with self.db:
+            self.db.execute(
+                "INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?)",
+                (self.next_block, offset, len(compressed), self.codec, self.next_doc, len(self.buffer))
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tokens (token) VALUES (?)",
+                ((t,) for t in block_postings)
+            )
+            self.db.executemany(
+                "UPDATE tokens SET df = df + ? WHERE token = ?",
+                ((len(ids), t) for t, ids in block_postings.items())
+            )
+            token_ids = self._token_ids(list(block_postings))
+            self.db.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?)",
+                ((token_ids[t], self.next_block, array('H', ids).tobytes()) for t, ids in block_postings.items())
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO posts VALUES (?, ?, ?)",
+                ((p['id'], self.next_block, i) for i, p in enumerate(self.buffer) if p['id'])
+            )
+        
+        self.next_block += 1
+        self.next_doc += len(self.buffer)
+        self.buffer = []
+        self._buffer_ids = set()
+    
+    def _token_ids(self, tokens):
+        """token -> id eşlemesi (SQLite parametre limiti için parça parça)"""
+        ids = {}
+        for i in range(0, len(tokens), 500):
+            chunk = tokens[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            ids.update(self.db.execute(f"SELECT token, id FROM tokens WHERE token IN ({placeholders})", chunk))
+        return ids
+    
+    def _read_block(self, block):
+        """Bloğu diskten okuyup açılmış post listesi olarak döndür (küçük LRU önbellekli)"""
+        if block in self._block_cache:
+            return self._block_cache[block]
+        
+        offset, length, codec = self.db.execute(
+            "SELECT offset, length, codec FROM blocks WHERE block = ?", (block,)
+        ).fetchone()
+        with open(self.data_path, 'rb') as f:
+            f.seek(offset)
+            compressed = f.read(length)
+        
+        if codec == self.CODEC_ZSTD:
+            if self._zstd_d is None:
+                raise RuntimeError("Arşiv zstd ile yazılmış, 'pip install zstandard' gerekli!")
+            raw = self._zstd_d.decompress(compressed)
+        else:
+            raw = zlib.decompress(compressed)
+        
+        posts = [json.loads(line) for line in raw.decode('utf-8').split("\n")]
+        if len(self._block_cache) >= 32:
+            self._block_cache.pop(next(iter(self._block_cache)))
+        self._block_cache[block] = posts
+        return posts
+    
+    def _candidates(self, keyword):
+        """Keyword'ün en seçici kelimesini içeren token'lara sahip (blok, sıra) adayları.
+        
+        Adaylar `search` içinde tam metinle doğrulandığı için tek kelime yeterli;
+        "do", "i" gibi kısa kelimeler neredeyse tüm token'larla eşleştiğinden atlanır.
+        """
+        words = self.TOKEN_RE.findall(keyword.lower())
+        long_words = [w for w in words if len(w) > 2]
+        words = long_words or words
+        if not words:
+            return set()
+        
+        # Canlı filtre alt-dize eşleşmesi yapıyor ("pain" -> "painful"), o yüzden
+        # kelimeyi içeren tüm token'lar genişletilir; en az postinge sahip kelime seçilir
+        best_ids, best_df = None, None
+        for word in words:
+            rows = self.db.execute("SELECT id, df FROM tokens WHERE instr(token, ?) > 0", (word,)).fetchall()
+            df = sum(r[1] for r in rows)
+            if best_df is None or df < best_df:
+                best_ids, best_df = [r[0] for r in rows], df
+        
+        docs = set()
+        for i in range(0, len(best_ids), 500):
+            chunk = best_ids[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for block, blob in self.db.execute(
+                f"SELECT block, docs FROM postings WHERE token_id IN ({placeholders})", chunk
+            ):
+                docs.update((block, local_id) for local_id in array('H', blob))
+        return docs
+    
+    def search(self, keywords, min_selftext=30):
+        """Yeni bir keyword setinin eşleşeceği arşivlenmiş postları döndür.
+        
+        Sonuçlar `_process_post` ile aynı kurala göre doğrulanır; her posta
+        eşleşen keyword'ler `keywords` alanında eklenir.
+        """
+        self.flush()
+        candidates = {}
+        for kw in keywords:
+            for doc in self._candidates(kw):
+                candidates.setdefault(doc, []).append(kw)
+        
+        matches = []
+        seen_ids = set()
+        for block, local_id in sorted(candidates):
+            post = self._read_block(block)[local_id]
+            # Eski arşivlerde yeniden başlatmalardan kalan kopyalar olabilir
+            if (post['id'] and post['id'] in seen_ids) or len(post['selftext']) < min_selftext:
+                continue
+            full_text = (post['title'] + " " + post['selftext']).lower()
+            hits = [kw for kw in candidates[(block, local_id)] if kw in full_text]
+            if hits:
+                seen_ids.add(post['id'])
+                matches.append(dict(post, keywords=hits))
+        return matches
+    
+    def stats(self):
+        """Arşiv boyutu özeti"""
+        blocks, docs = self.db.execute("SELECT COUNT(*), COALESCE(SUM(count), 0) FROM blocks").fetchone()
+        size = os.path.getsize(self.data_path) if os.path.isfile(self.data_path) else 0
+        return {"blocks": blocks, "posts": docs + len(self.buffer), "bytes": size}
+
+
+class EngagementTracker:
+    """Kayıtlı fırsatların upvote/yorum etkileşimini /api/info ile toplu olarak günceller"""
+    
+    INFO_URL = "https://www.reddit.com/api/info.json"
+    IDS_PER_REQUEST = 100  # Reddit /api/info tek istekte en fazla 100 fullname kabul eder
+    
+    def __init__(self, path=None):
+        self.db = sqlite3.connect(path or Config.TRACKING_DB)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS tracked (
+                reddit_id TEXT PRIMARY KEY, permalink TEXT, opp_score INTEGER,
+                created_utc REAL, added_at REAL, last_refresh REAL, next_refresh REAL,
+                score INTEGER DEFAULT 0, num_comments INTEGER DEFAULT 0, upvote_ratio REAL,
+                score_velocity REAL DEFAULT 0, comment_velocity REAL DEFAULT 0,
+                refresh_count INTEGER DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_tracked_next ON tracked (next_refresh);
+        """)
+    
+    def track(self, opp):
+        """Fırsatı takip listesine ekle (ilk güncelleme bir sonraki turda)"""
+        if not opp.get('reddit_id'):
+            return
+        now = time.time()
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO tracked (reddit_id, permalink, opp_score, created_utc, added_at, next_refresh) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (opp['reddit_id'], opp.get('permalink'), opp.get('score'), opp.get('created_utc'), now, now)
+            )
+    
+    @staticmethod
+    def next_interval(age_seconds):
+        """Azalan güncelleme sıklığı: genç postlar sık, yaşlılar seyrek yenilenir"""
+        interval = age_seconds * Config.TRACKING_REFRESH_FACTOR
+        return min(max(interval, Config.TRACKING_MIN_INTERVAL), Config.TRACKING_MAX_INTERVAL)
+    
+    def refresh_due(self, max_requests=None):
+        """Zamanı gelen postları 100'lük /api/info istekleriyle güncelle"""
+        max_requests = max_requests or Config.TRACKING_MAX_REQUESTS
+        now = time.time()
+        rows = self.db.execute(
+            "SELECT reddit_id, created_utc, last_refresh, score, num_comments FROM tracked "
+            "WHERE next_refresh <= ? ORDER BY next_refresh LIMIT ?",
+            (now, max_requests * self.IDS_PER_REQUEST)
+        ).fetchall()
+        
+        refreshed = 0
+        for i in range(0, len(rows), self.IDS_PER_REQUEST):
+            chunk = {row[0]: row for row in rows[i:i + self.IDS_PER_REQUEST]}
+            fetched = self._fetch_info(list(chunk))
+            if fetched is None:
+                break
+            refreshed += self._apply(chunk, fetched)
+        return refreshed
+    
+    def _fetch_info(self, reddit_ids):
+        """Tek istekte en fazla 100 postun güncel verisini çek"""
+        params = {"id": ",".join(f"t3_{pid}" for pid in reddit_ids), "raw_json": 1}
+        try:
+            response = requests.get(self.INFO_URL, params=params, headers=Config.HEADERS, timeout=15)
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ Etkileşim güncelleme hatası: {e}")
+            return None
+        
+        if response.status_code == 429:
+            print("⏳ Rate limit! Etkileşim güncellemesi sonraki tura ertelendi.")
+            return None
+        if response.status_code != 200:
+            print(f"⚠️ Reddit /api/info HTTP {response.status_code}")
+            return None
+        
+        children = response.json().get('data', {}).get('children', [])
+        return {c['data']['id']: c['data'] for c in children if c.get('data', {}).get('id')}
+    
+    def _apply(self, chunk, fetched):
+        """Yeni değerlerden hız metriklerini hesapla ve sonraki güncelleme zamanını planla"""
+        now = time.time()
+        updates, expired = [], []
+        
+        for pid, (_, created_utc, last_refresh, old_score, old_comments) in chunk.items():
+            data = fetched.get(pid)
+            created_utc = created_utc or (data or {}).get('created_utc') or now
+            age = now - created_utc
+            
+            # Silinmiş ya da takip süresi dolmuş postları bırak
+            if data is None or age > Config.TRACKING_MAX_AGE:
+                expired.append((pid,))
+                continue
+            
+            score = data.get('score', 0)
+            comments = data.get('num_comments', 0)
+            # İlk güncellemede oluşturulmadan bu yana, sonrakilerde son güncellemeden bu yana saatlik hız
+            since = last_refresh or created_utc
+            hours = max((now - since) / 3600, 1 / 60)
+            base_score = old_score if last_refresh else 0
+            base_comments = old_comments if last_refresh else 0
+            
+            updates.append((
+                created_utc, now, now + self.next_interval(age), score, comments,
+                data.get('upvote_ratio'), round((score - base_score) / hours, 3),
+                round((comments - base_comments) / hours, 3), pid
+            ))
+        
+        with self.db:
+            self.db.executemany(
+                "UPDATE tracked SET created_utc = ?, last_refresh = ?, next_refresh = ?, score = ?, "
+                "num_comments = ?, upvote_ratio = ?, score_velocity = ?, comment_velocity = ?, "
+                "refresh_count = refresh_count + 1 WHERE reddit_id = ?",
+                updates
+            )
+            # Takibi biten kayıtlar silinmez, sadece planlamadan çıkarılır (son metrikler kalır)
+            self.db.executemany("UPDATE tracked SET next_refresh = 1e18 WHERE reddit_id = ?", expired)
+        return len(updates)
+    
+    def top_traction(self, limit=10):
+        """Gerçek etkileşime göre en çok yükselen fırsatlar"""
+        rows = self.db.execute(
+            "SELECT reddit_id, permalink, opp_score, score, num_comments, score_velocity, comment_velocity "
+            "FROM tracked WHERE refresh_count > 0 "
+            "ORDER BY score_velocity + 2 * comment_velocity DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        keys = ("reddit_id", "permalink", "opp_score", "score", "num_comments", "score_velocity", "comment_velocity")
+        return [dict(zip(keys, row)) for row in rows]
+    
+    def print_traction(self, limit=10):
+        """En çok ilgi gören fırsatları konsola yazdır"""
+        print("\n" + "="*60)
+        print("🔥 EN ÇOK İLGİ GÖREN FIRSATLAR")
+        print("="*60)
+        rows = self.top_traction(limit)
+        if not rows:
+            print("Henüz etkileşim verisi yok.")
+        for r in rows:
+            print(f"⬆️ {r['score']} ({r['score_velocity']:+.1f}/sa) | 💬 {r['num_comments']} ({r['comment_velocity']:+.1f}/sa) | AI: {r['opp_score']}/10")
+            print(f"   🔗 {r['permalink']}")
+        print("="*60 + "\n", flush=True)
+
+
+class KeywordStats:
+    """Keyword ve subreddit bazında tetiklenme, LLM maliyeti ve fırsat verimi takibi"""
+    
+    EMPTY = {"hits": 0, "analyzed": 0, "opportunities": 0, "cost": 0.0,
+             "solo_analyzed": 0, "solo_opportunities": 0, "solo_cost": 0.0}
+    
+    def __init__(self, path=None):
+        self.path = path or Config.KEYWORD_STATS_FILE
+        self.keywords = {}
+        self.subreddits = {}
+        self.status = {}  # keyword -> "active" | "demoted" | "disabled"
+        self.probation = {}  # budanan keyword -> budama anındaki solo_* sayaçları
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                self.keywords = state.get('keywords', {})
+                self.subreddits = state.get('subreddits', {})
+                self.status = state.get('status', {})
+                self.probation = state.get('probation', {})
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Keyword istatistikleri okunamadı ({e}), sıfırdan başlanıyor.")
+    
+    def save(self):
+        """İstatistikleri diske yaz (atomik)"""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"keywords": self.keywords, "subreddits": self.subreddits,
+                       "status": self.status, "probation": self.probation},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+    
+    def _entry(self, table, key):
+        return table.setdefault(key, dict(self.EMPTY))
+    
+    def record_hits(self, keywords, subreddit):
+        """Keyword kontrolünde tetiklenenleri say"""
+        for kw in keywords:
+            self._entry(self.keywords, kw)['hits'] += 1
+        if subreddit:
+            self._entry(self.subreddits, subreddit)['hits'] += 1
+    
+    def active(self, keywords):
+        """Devre dışı bırakılmamış keyword'ler (kayıtlı durumlar sadece politika açıkken geçerli).
+        
+        Kapalı keyword'ler KEYWORD_PROBATION_RATE oranında yine geçer, böylece
+        yeni örnek toplanır ve verimi düzelirse geri açılabilir.
+        """
+        if Config.KEYWORD_PRUNING != 'disable':
+            return list(keywords)
+        return [
+            kw for kw in keywords
+            if self.status.get(kw) != 'disabled' or random.random() < Config.KEYWORD_PROBATION_RATE
+        ]
+    
+    def weights(self):
+        """Öncelik hesabı için keyword ağırlıkları (düşürülenler cezalı, politika kapalıysa yok)"""
+        weights = dict(Config.KEYWORD_WEIGHTS)
+        if Config.KEYWORD_PRUNING not in ('demote', 'disable'):
+            return weights
+        for kw, status in self.status.items():
+            if status in ('demoted', 'disabled'):
+                weights[kw] = weights.get(kw, 1.0) * Config.KEYWORD_DEMOTE_FACTOR
+        return weights
+    
+    def reset(self, keywords=None):
+        """Budanan keyword'leri (hepsini veya verilenleri) tekrar aktif yap"""
+        targets = list(self.status) if not keywords else [kw for kw in keywords if kw in self.status]
+        for kw in targets:
+            self.status.pop(kw, None)
+            self.probation.pop(kw, None)
+        return targets
+    
+    def record_outcome(self, post, is_opportunity):
+        """Analiz sonucunu postu tetikleyen keyword'lere ve subreddit'e yaz"""
+        keywords = post.get('keywords') or []
+        cost = (post.get('telemetry') or {}).get('cost', 0.0)
+        
+        for kw in keywords:
+            entry = self._entry(self.keywords, kw)
+            entry['analyzed'] += 1
+            entry['opportunities'] += int(is_opportunity)
+            entry['cost'] += cost
+            # Tek başına tetiklediği postlar: keyword kapatılırsa kaybedilecek olanlar
+            if len(keywords) == 1:
+                entry['solo_analyzed'] += 1
+                entry['solo_opportunities'] += int(is_opportunity)
+                entry['solo_cost'] += cost
+        
+        if post.get('subreddit'):
+            entry = self._entry(self.subreddits, post['subreddit'])
+            entry['analyzed'] += 1
+            entry['opportunities'] += int(is_opportunity)
+            entry['cost'] += cost
+    
+    @staticmethod
+    def yield_per_dollar(entry, solo=True):
+        """Dolar başına fırsat (maliyet yoksa None)"""
+        prefix = 'solo_' if solo else ''
+        cost = entry[prefix + 'cost']
+        return entry[prefix + 'opportunities'] / cost if cost > 0 else None
+    
+    def apply_policy(self):
+        """Verimi eşiğin altında kalan keyword'leri düşür veya kapat"""
+        if Config.KEYWORD_PRUNING not in ('demote', 'disable'):
+            return []
+        
+        changed = []
+        for kw, entry in self.keywords.items():
+            if self.status.get(kw, 'active') != 'active':
+                if self._review_probation(kw, entry):
+                    changed.append(kw)
+                continue
+            if entry['solo_analyzed'] < Config.KEYWORD_MIN_SAMPLES:
+                continue
+            ypd = self.yield_per_dollar(entry)
+            if ypd is not None and ypd < Config.KEYWORD_MIN_YIELD:
+                self.status[kw] = 'demoted' if Config.KEYWORD_PRUNING == 'demote' else 'disabled'
+                self.probation[kw] = self._solo_snapshot(entry)
+                changed.append(kw)
+                print(f"✂️ Keyword '{kw}' {self.status[kw]} (verim: {ypd:.1f} fırsat/$)", flush=True)
+        return changed
+    
+    @staticmethod
+    def _solo_snapshot(entry):
+        return {k: entry[k] for k in ('solo_analyzed', 'solo_opportunities', 'solo_cost')}
+    
+    def _review_probation(self, kw, entry):
+        """Budamadan sonra toplanan örneklerle verimi yeniden değerlendir, düzeldiyse geri aç"""
+        base = self.probation.get(kw) or self._solo_snapshot(entry)
+        recent = {k: entry[k] - base[k] for k in base}
+        if recent['solo_analyzed'] < Config.KEYWORD_MIN_SAMPLES:
+            self.probation[kw] = base
+            return False
+        
+        ypd = self.yield_per_dollar(recent)
+        if ypd is None or ypd >= Config.KEYWORD_MIN_YIELD:
+            self.status.pop(kw, None)
+            self.probation.pop(kw, None)
+            print(f"♻️ Keyword '{kw}' tekrar aktif (son verim: {ypd or 0:.1f} fırsat/$)", flush=True)
+            return True
+        
+        # Hâlâ düşük: yeni bir değerlendirme penceresi başlat
+        self.probation[kw] = self._solo_snapshot(entry)
+        return False
+    
+    def print_report(self):
+        """Keyword ve subreddit verim tablosunu yazdır"""
+        def rows(table, solo):
+            for key, e in sorted(table.items(), key=lambda kv: -kv[1]['opportunities']):
+                ypd = self.yield_per_dollar(e, solo=False)
+                precision = e['opportunities'] / e['analyzed'] if e['analyzed'] else 0
+                status = self.status.get(key, 'active') if solo else ''
+                print(f"{key[:18]:<18} {e['hits']:>6} {e['analyzed']:>6} {e['opportunities']:>5} "
+                      f"{precision:>6.0%} {e['cost']:>8.4f} {ypd if ypd is not None else 0:>8.1f} {status}")
+        
+        header = f"{'':<18} {'Tetik':>6} {'Analiz':>6} {'Fırs.':>5} {'İsabet':>6} {'Maliyet$':>8} {'Fırs/$':>8}"
+        print("\n" + "="*70)
+        print("🔑 KEYWORD VERİMİ")
+        print(header)
+        rows(self.keywords, True)
+        print("-"*70)
+        print("📍 SUBREDDIT VERİMİ")
+        print(header)
+        rows(self.subreddits, False)
+        print("="*70 + "\n", flush=True)
 
 
 class CSVWriter:
@@ -248,13 +1605,571 @@ class CSVWriter:
         print(f"💾 {len(opportunities)} fırsat CSV'ye kaydedildi.", flush=True)
 
 
+class EventPublisher:
+    """Fırsatları SSE ve webhook ile anlık yayınlayan gömülü async sunucu"""
+    
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.subscribers = set()  # her SSE istemcisi için sınırlı asyncio.Queue
+        self.webhook_queues = []
+        self.history = deque(maxlen=Config.EVENT_HISTORY_SIZE)  # Last-Event-ID ile tekrar oynatma
+        self.event_id = 0
+        self.dropped = 0
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-publisher", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+    
+    def _run(self):
+        """Arka plan thread'inde event loop'u çalıştır"""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._start())
+        self._ready.set()
+        self.loop.run_forever()
+    
+    async def _start(self):
+        """SSE sunucusunu ve webhook işçilerini başlat"""
+        if Config.EVENT_SERVER_PORT:
+            try:
+                await asyncio.start_server(self._handle_client, Config.EVENT_SERVER_HOST, Config.EVENT_SERVER_PORT)
+                print(f"📡 SSE sunucusu: http://{Config.EVENT_SERVER_HOST}:{Config.EVENT_SERVER_PORT}/events")
+            except OSError as e:
+                print(f"⚠️ SSE sunucusu başlatılamadı: {e}")
+        
+        for url in Config.WEBHOOK_URLS:
+            queue = asyncio.Queue(maxsize=Config.EVENT_QUEUE_SIZE)
+            self.webhook_queues.append(queue)
+            self.loop.create_task(self._webhook_worker(url, queue))
+    
+    def publish(self, opp):
+        """Tarama thread'inden çağrılır; asla bloklamaz"""
+        self.loop.call_soon_threadsafe(self._fanout, dict(opp))
+    
+    def _offer(self, queue, item):
+        """Kuyruk doluysa en eskiyi atıp yeni olayı ekle (yavaş tüketici taramayı bekletmez)"""
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(item)
+    
+    def _fanout(self, opp):
+        """Olayı tüm SSE abonelerine ve webhook kuyruklarına dağıt (event loop içinde)"""
+        self.event_id += 1
+        event = {
+            "id": self.event_id,
+            "time": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "opportunity": opp
+        }
+        self.history.append(event)
+        for queue in list(self.subscribers) + self.webhook_queues:
+            self._offer(queue, event)
+    
+    async def _handle_client(self, reader, writer):
+        """Basit HTTP: GET /events (SSE) ve GET /health"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=10)
+            headers = {}
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=10)
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+        except (asyncio.TimeoutError, ConnectionError, ValueError, asyncio.LimitOverrunError):
+            # Zaman aşımı, kopan bağlantı ya da limiti aşan (çok uzun) istek satırı
+            writer.close()
+            return
+        
+        parts = request_line.decode('latin-1').split()
+        path = parts[1].split('?')[0] if len(parts) > 1 else '/'
+        
+        if path == '/health':
+            body = json.dumps({
+                "subscribers": len(self.subscribers),
+                "webhooks": len(self.webhook_queues),
+                "last_event_id": self.event_id,
+                "dropped": self.dropped
+            }).encode('utf-8')
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+            await writer.drain()
+            writer.close()
+            return
+        
+        if path != '/events':
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        
+        await self._stream_events(writer, headers.get('last-event-id'))
+    
+    async def _stream_events(self, writer, last_event_id):
+        """SSE akışı: abone kuyruğundaki olayları istemciye yaz"""
+        queue = asyncio.Queue(maxsize=Config.EVENT_QUEUE_SIZE)
+        
+        # Yeniden bağlanan istemciye kaçırdığı olayları gönder
+        if last_event_id and last_event_id.isdigit():
+            for event in self.history:
+                if event['id'] > int(last_event_id):
+                    self._offer(queue, event)
+        self.subscribers.add(queue)
+        
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+            await writer.drain()
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                    data = json.dumps(event['opportunity'], ensure_ascii=False)
+                    writer.write(f"id: {event['id']}\nevent: opportunity\ndata: {data}\n\n".encode('utf-8'))
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.subscribers.discard(queue)
+            writer.close()
+    
+    async def _webhook_worker(self, url, queue):
+        """Webhook'a olayları toplu (batch) ve tekrar denemeli olarak gönder"""
+        while True:
+            events = [await queue.get()]
+            # Kısa pencere içinde gelen diğer olayları da aynı isteğe ekle
+            deadline = self.loop.time() + Config.WEBHOOK_BATCH_WINDOW
+            while len(events) < Config.WEBHOOK_BATCH_SIZE:
+                remaining = deadline - self.loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            payload = {"events": [{"id": e['id'], "time": e['time'], **e['opportunity']} for e in events]}
+            for attempt in range(Config.WEBHOOK_MAX_RETRIES):
+                try:
+                    response = await self.loop.run_in_executor(
+                        None, lambda: requests.post(url, json=payload, timeout=10)
+                    )
+                    if 200 <= response.status_code < 300:
+                        break
+                    # 429 dışındaki 4xx'ler tekrar denemeyle düzelmez (yanlış URL, yetki vb.)
+                    if response.status_code < 500 and response.status_code != 429:
+                        print(f"❌ Webhook {len(events)} olayı reddetti ({url}): HTTP {response.status_code}")
+                        break
+                    error = f"HTTP {response.status_code}"
+                except requests.exceptions.RequestException as e:
+                    error = e
+                # Son denemeden sonra beklemeden vazgeç (kuyruk boşuna dolmasın)
+                if attempt + 1 >= Config.WEBHOOK_MAX_RETRIES:
+                    print(f"❌ Webhook {len(events)} olayı teslim edemedi ({url}): {error}")
+                    break
+                wait_time = 2 ** attempt
+                print(f"⚠️ Webhook hatası ({url}): {error}, {wait_time} sn sonra tekrar denenecek...")
+                await asyncio.sleep(wait_time)
+
+
+class ParquetExporter:
+    """Fırsatları ve tarama telemetrisini tarihe göre bölümlenmiş Parquet dosyalarına yazar"""
+    
+    def __init__(self, directory=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow paketi yüklü değil! 'pip install pyarrow' çalıştırın.")
+        
+        self.pa, self.pq = pa, pq
+        self.directory = directory or Config.PARQUET_DIR
+        self.buffers = {"opportunities": [], "scans": []}
+        self.last_flush = time.time()
+        
+        # Kategorik kolonlar sözlük (dictionary) kodlamalı: subreddit/model her satırda tekrar etmez
+        category = pa.dictionary(pa.int32(), pa.string())
+        self.schemas = {
+            "opportunities": pa.schema([
+                ("timestamp", pa.timestamp('s')),
+                ("score", pa.int8()),
+                ("pain_point", pa.string()),
+                ("suggested_solution", pa.string()),
+                ("target_audience", pa.string()),
+                ("permalink", pa.string()),
+                ("reddit_id", pa.string()),
+                ("subreddit", category),
+                ("keywords", pa.list_(category)),
+                ("model", category),
+                ("tokens", pa.float32()),
+                ("latency", pa.float32()),
+                ("cost", pa.float64())
+            ]),
+            "scans": pa.schema([
+                ("timestamp", pa.timestamp('s')),
+                ("fetched", pa.int16()),
+                ("new", pa.int16()),
+                ("queued", pa.int32()),
+                ("dropped", pa.int32()),
+                ("duration", pa.float32()),
+                ("status", category)
+            ])
+        }
+    
+    def add_opportunities(self, opportunities, when=None):
+        """Fırsatları yazma buffer'ına ekle"""
+        when = when or datetime.now()
+        for opp in opportunities:
+            telemetry = opp.get('telemetry') or {}
+            try:
+                score = int(opp.get('score'))
+            except (TypeError, ValueError):
+                score = None
+            self.buffers["opportunities"].append({
+                "timestamp": when.replace(microsecond=0),
+                "score": score,
+                "pain_point": opp.get('pain_point'),
+                "suggested_solution": opp.get('suggested_solution'),
+                "target_audience": opp.get('target_audience'),
+                "permalink": opp.get('permalink'),
+                "reddit_id": opp.get('reddit_id'),
+                "subreddit": opp.get('subreddit'),
+                "keywords": opp.get('keywords') or [],
+                "model": telemetry.get('model'),
+                "tokens": telemetry.get('tokens'),
+                "latency": telemetry.get('latency'),
+                "cost": telemetry.get('cost')
+            })
+        self._maybe_flush()
+    
+    def add_scan(self, fetched, new, queued, dropped, duration, status='ok'):
+        """Tek bir tarama döngüsünün telemetrisini buffer'a ekle"""
+        self.buffers["scans"].append({
+            "timestamp": datetime.now().replace(microsecond=0),
+            "fetched": fetched, "new": new, "queued": queued,
+            "dropped": dropped, "duration": round(duration, 3), "status": status
+        })
+        self._maybe_flush()
+    
+    def _maybe_flush(self):
+        """Satır eşiği veya süre dolunca diske yaz (çok küçük dosya üretmemek için)"""
+        pending = sum(len(rows) for rows in self.buffers.values())
+        if pending >= Config.PARQUET_FLUSH_ROWS or time.time() - self.last_flush >= Config.PARQUET_FLUSH_INTERVAL:
+            self.flush()
+    
+    def flush(self):
+        """Buffer'ları yeni Parquet dosyaları olarak ekle (mevcut dosyalar yeniden yazılmaz)"""
+        self.last_flush = time.time()
+        for name, rows in self.buffers.items():
+            if not rows:
+                continue
+            
+            # Hive tarzı bölümleme: <dizin>/<tablo>/date=YYYY-MM-DD/part-....parquet
+            by_date = {}
+            for row in rows:
+                by_date.setdefault(row['timestamp'].strftime('%Y-%m-%d'), []).append(row)
+            
+            for day, day_rows in by_date.items():
+                partition = os.path.join(self.directory, name, f"date={day}")
+                os.makedirs(partition, exist_ok=True)
+                table = self.pa.Table.from_pylist(day_rows, schema=self.schemas[name])
+                filename = f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+                self.pq.write_table(table, os.path.join(partition, filename), compression='zstd')
+            
+            self.buffers[name] = []
+    
+    def import_csv(self, csv_path=None):
+        """Mevcut CSV geçmişini bir kereye mahsus Parquet'e aktar"""
+        csv_path = csv_path or Config.OUTPUT_FILE
+        if os.path.isdir(os.path.join(self.directory, "opportunities")):
+            print("⚠️ Parquet fırsat verisi zaten var, tekrar aktarım yapılmadı.")
+            return 0
+        if not os.path.isfile(csv_path):
+            return 0
+        
+        count = 0
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    when = datetime.strptime(row.get('Tarih', ''), '%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    continue
+                self.add_opportunities([{
+                    "score": row.get('Puan'),
+                    "pain_point": row.get('Problem'),
+                    "suggested_solution": row.get('Fikir'),
+                    # Eski scriptler 'Hedef Kitle', v2 'Hedef' başlığını kullanıyor
+                    "target_audience": row.get('Hedef') or row.get('Hedef Kitle'),
+                    "permalink": row.get('Link')
+                }], when)
+                count += 1
+        self.flush()
+        return count
+
+
+class OpportunityClusterer:
+    """Fırsatları hash'lenmiş n-gram vektörleriyle artımlı olarak kümeler ve trend tutar"""
+    
+    TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+    DATE_FORMAT = '%Y-%m-%d'
+    
+    def __init__(self, path=None):
+        self.path = path or Config.CLUSTER_FILE
+        self.dim = Config.CLUSTER_DIM
+        self.threshold = Config.CLUSTER_THRESHOLD
+        self.max_terms = Config.CLUSTER_MAX_TERMS
+        self.clusters = []
+        self.dirty = False
+        self.last_save = time.time()
+        self._load()
+    
+    def _load(self):
+        """Kayıtlı küme durumunu diskten yükle"""
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Küme dosyası okunamadı ({e}), sıfırdan başlanıyor.")
+            return
+        
+        if state.get('dim') != self.dim:
+            print("⚠️ Küme vektör boyutu değişmiş, kümeler sıfırlanıyor.")
+            return
+        self.clusters = state.get('clusters', [])
+        for cluster in self.clusters:
+            centroid = cluster['centroid']
+            if isinstance(centroid, list):
+                # Eski yoğun (ortalama) format: seyrek toplam vektörüne çevir
+                n = cluster['count'] or 1
+                centroid = {i: v * n for i, v in enumerate(centroid) if v}
+            else:
+                centroid = {int(i): v for i, v in centroid.items()}
+            cluster['centroid'] = centroid
+            self._prune(cluster)
+    
+    def save(self):
+        """Küme durumunu diske yaz (atomik)"""
+        clusters = [
+            dict(c, centroid={i: round(w, 3) for i, w in c['centroid'].items()})
+            for c in self.clusters
+        ]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"dim": self.dim, "clusters": clusters}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        self.last_save = time.time()
+    
+    def save_if_due(self):
+        """Değişiklik varsa ve kayıt aralığı dolduysa diske yaz (tarama döngüsünü yavaşlatmamak için)"""
+        if self.dirty and time.time() - self.last_save >= Config.CLUSTER_SAVE_INTERVAL:
+            self.save()
+    
+    def _sketch(self, text):
+        """Metni normalize edilmiş seyrek hash vektörüne dönüştür (kelime + karakter 3-gram)"""
+        vec = {}
+        tokens = self.TOKEN_RE.findall(text.lower())
+        
+        features = list(tokens)
+        features += [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for tok in tokens:
+            padded = f"#{tok}#"
+            features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+        
+        for feat in features:
+            h = zlib.crc32(feat.encode('utf-8'))
+            idx = h % self.dim
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            vec[idx] = vec.get(idx, 0.0) + sign
+        
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        if not norm:
+            return {}
+        return {i: v / norm for i, v in vec.items()}
+    
+    def _nearest(self, vec):
+        """En yakın kümeyi ve kosinüs benzerliğini bul"""
+        best, best_sim = None, -1.0
+        for cluster in self.clusters:
+            centroid = cluster['centroid']
+            sim = sum(centroid.get(i, 0.0) * w for i, w in vec.items()) / (cluster['norm'] or 1.0)
+            if sim > best_sim:
+                best, best_sim = cluster, sim
+        return best, best_sim
+    
+    def add(self, opp, when=None):
+        """Yeni bir fırsatı uygun kümeye ekle (gerekirse yeni küme aç)"""
+        text = f"{opp.get('pain_point', '')} {opp.get('target_audience', '')}"
+        vec = self._sketch(text)
+        if not vec:
+            return None
+        
+        when = when or datetime.now()
+        try:
+            score = float(opp.get('score', 0))
+        except (TypeError, ValueError):
+            score = 0.0
+        
+        cluster, sim = self._nearest(vec)
+        if cluster is None or sim < self.threshold:
+            cluster = {
+                "id": len(self.clusters),
+                "label": (opp.get('pain_point') or '')[:120],
+                "centroid": {},
+                "norm": 0.0,
+                "count": 0,
+                "score_sum": 0.0,
+                "score_sq_sum": 0.0,
+                "score_max": score,
+                "first_seen": when.strftime(self.DATE_FORMAT),
+                "buckets": {},
+                "links": []
+            }
+            self.clusters.append(cluster)
+        
+        # Merkez vektörü üyelerin toplamı olarak tutulur (kosinüs ölçekten bağımsız):
+        # güncelleme sadece postun dokunduğu boyutlar kadar sürer
+        n = cluster['count']
+        centroid = cluster['centroid']
+        for i, w in vec.items():
+            centroid[i] = centroid.get(i, 0.0) + w
+        self._prune(cluster)
+        self.dirty = True
+        
+        # Skor istatistikleri ve zaman serisi
+        cluster['count'] = n + 1
+        cluster['score_sum'] += score
+        cluster['score_sq_sum'] += score * score
+        cluster['score_max'] = max(cluster['score_max'], score)
+        day = when.strftime(self.DATE_FORMAT)
+        cluster['buckets'][day] = cluster['buckets'].get(day, 0) + 1
+        
+        link = opp.get('permalink')
+        if link and len(cluster['links']) < 10:
+            cluster['links'].append(link)
+        
+        return cluster['id']
+    
+    def _prune(self, cluster):
+        """Merkez vektöründe sadece en ağırlıklı boyutları tut ve normu yeniden hesapla"""
+        centroid = cluster['centroid']
+        if len(centroid) > self.max_terms:
+            top = sorted(centroid.items(), key=lambda kv: abs(kv[1]), reverse=True)[:self.max_terms]
+            cluster['centroid'] = centroid = dict(top)
+        cluster['norm'] = math.sqrt(sum(w * w for w in centroid.values()))
+    
+    def _window_count(self, cluster, start, end):
+        """Verilen gün aralığındaki [start, end) fırsat sayısı"""
+        total = 0
+        day = start
+        while day < end:
+            total += cluster['buckets'].get(day.strftime(self.DATE_FORMAT), 0)
+            day += timedelta(days=1)
+        return total
+    
+    def stats(self, cluster):
+        """Küme için ortalama ve standart sapma"""
+        n = cluster['count'] or 1
+        mean = cluster['score_sum'] / n
+        var = max(cluster['score_sq_sum'] / n - mean * mean, 0.0)
+        return mean, math.sqrt(var)
+    
+    def top_rising(self, limit=10, window_days=None, now=None):
+        """Son pencerede bir önceki pencereye göre en çok yükselen kümeleri döndür"""
+        window_days = window_days or Config.TREND_WINDOW_DAYS
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        end = today + timedelta(days=1)
+        mid = end - timedelta(days=window_days)
+        start = mid - timedelta(days=window_days)
+        
+        rising = []
+        for cluster in self.clusters:
+            recent = self._window_count(cluster, mid, end)
+            if not recent:
+                continue
+            previous = self._window_count(cluster, start, mid)
+            # Küçük örneklerde sıçramaları yumuşatmak için +1 düzeltmesi
+            growth = (recent + 1) / (previous + 1)
+            rising.append((growth * recent, recent, previous, cluster))
+        
+        rising.sort(key=lambda r: r[0], reverse=True)
+        return [
+            {
+                "id": c['id'],
+                "label": c['label'],
+                "recent": recent,
+                "previous": previous,
+                "total": c['count'],
+                "avg_score": round(self.stats(c)[0], 2),
+                "links": c['links'][:3]
+            }
+            for _, recent, previous, c in rising[:limit]
+        ]
+    
+    def import_csv(self, csv_path=None):
+        """Mevcut CSV kayıtlarını kümelere aktar"""
+        csv_path = csv_path or Config.OUTPUT_FILE
+        if not os.path.isfile(csv_path):
+            return 0
+        
+        count = 0
+        with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                try:
+                    when = datetime.strptime(row.get('Tarih', ''), '%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    when = None
+                opp = {
+                    "pain_point": row.get('Problem', ''),
+                    # Eski scriptler 'Hedef Kitle', v2 'Hedef' başlığını kullanıyor
+                    "target_audience": row.get('Hedef') or row.get('Hedef Kitle', ''),
+                    "score": row.get('Puan', 0),
+                    "permalink": row.get('Link')
+                }
+                if self.add(opp, when) is not None:
+                    count += 1
+        return count
+    
+    def print_trends(self, limit=10):
+        """Yükselen kümeleri konsola yazdır"""
+        rising = self.top_rising(limit)
+        print("\n" + "="*60)
+        print(f"📈 YÜKSELEN FIRSAT KÜMELERİ (Son {Config.TREND_WINDOW_DAYS} gün)")
+        print("="*60)
+        if not rising:
+            print("Son dönemde trend bulunamadı.")
+        for r in rising:
+            print(f"#{r['id']} | Son: {r['recent']} | Önceki: {r['previous']} | Toplam: {r['total']} | Ort. Puan: {r['avg_score']}")
+            print(f"   😭 {r['label']}")
+            for link in r['links']:
+                print(f"   🔗 {link}")
+        print("="*60 + "\n", flush=True)
+
+
 class MarketRadar:
     """Ana tarama sınıfı"""
     
     def __init__(self):
         self.analyzer = AIAnalyzer()
+        self.screening = None
+        if Config.LOCAL_SCREENING and Config.AI_PROVIDER != 'local':
+            self.screening = ScreeningAnalyzer(AIAnalyzer('local'), self.analyzer)
+        self.clusterer = OpportunityClusterer() if Config.CLUSTER_ENABLED else None
+        self.batch_offload = BatchOffloader(self.analyzer) if Config.ANALYSIS_MODE == 'batch' else None
+        self.events = EventPublisher() if Config.EVENT_SERVER_PORT or Config.WEBHOOK_URLS else None
+        self.archive = PostArchive() if Config.ARCHIVE_ENABLED else None
+        self.tracker = EngagementTracker() if Config.TRACKING_ENABLED else None
+        self.keyword_stats = KeywordStats()
+        self.parquet = None
+        if Config.PARQUET_ENABLED:
+            try:
+                self.parquet = ParquetExporter()
+            except ImportError as e:
+                print(f"⚠️ Parquet dışa aktarımı kapalı: {e}")
         self.seen_posts = set()
-        self.post_buffer = []
+        self.queue = AnalysisQueue()
     
     def run(self):
         """Radar'ı başlat"""
@@ -263,8 +2178,22 @@ class MarketRadar:
         while True:
             try:
                 self._scan_cycle()
+                if self.batch_offload:
+                    self._poll_batch_jobs()
+                if self.tracker:
+                    self.tracker.refresh_due()
+                if self.clusterer:
+                    self.clusterer.save_if_due()
                 time.sleep(Config.SCAN_INTERVAL)
             except KeyboardInterrupt:
+                if self.batch_offload:
+                    self.batch_offload.submit()
+                if self.archive:
+                    self.archive.flush()
+                if self.parquet:
+                    self.parquet.flush()
+                if self.clusterer and self.clusterer.dirty:
+                    self.clusterer.save()
                 print("\n\n👋 Market Radar durduruldu. Güle güle!")
                 break
             except Exception as e:
@@ -276,8 +2205,9 @@ class MarketRadar:
         print("\n" + "="*60)
         print("🚀 MARKET RADAR v2.0 - Reddit Fırsat Tarayıcısı")
         print("="*60)
-        print(f"🤖 AI Sağlayıcı: {Config.AI_PROVIDER.upper()}")
+        print(f"🤖 AI Sağlayıcı: {Config.AI_PROVIDER.upper()}" + (" (+ yerel ön eleme)" if self.screening else ""))
         print(f"📦 Batch Boyutu: {Config.BATCH_SIZE}")
+        print(f"🗂️ Analiz Modu: {Config.ANALYSIS_MODE.upper()}")
         print(f"🎯 Min. Puan: {Config.MIN_SCORE}")
         print(f"📍 Subredditler: {', '.join(Config.TARGET_SUBREDDITS)}")
         print("="*60 + "\n")
@@ -286,16 +2216,19 @@ class MarketRadar:
     def _scan_cycle(self):
         """Tek bir tarama döngüsü"""
         url = f"https://www.reddit.com/r/{'+'.join(Config.TARGET_SUBREDDITS)}/new.json?limit=25"
+        started = time.time()
         
         try:
             response = requests.get(url, headers=Config.HEADERS, timeout=15)
             
             if response.status_code == 429:
+                self._record_scan(started, status='rate_limited')
                 print("⏳ Rate limit! 60 saniye bekleniyor...")
                 time.sleep(60)
                 return
             
             if response.status_code != 200:
+                self._record_scan(started, status=f"http_{response.status_code}")
                 print(f"⚠️ Reddit HTTP {response.status_code}")
                 return
             
@@ -307,18 +2240,24 @@ class MarketRadar:
                 if self._process_post(post['data']):
                     new_count += 1
             
-            # Buffer dolduysa analiz et
-            if len(self.post_buffer) >= Config.BATCH_SIZE:
-                self._analyze_buffer()
+            self._dispatch()
+            self._record_scan(started, fetched=len(posts), new=new_count)
             
-            status = f"🔄 Tarandı: {len(posts)} post | Yeni: {new_count} | Buffer: {len(self.post_buffer)}/{Config.BATCH_SIZE}"
+            status = f"🔄 Tarandı: {len(posts)} post | Yeni: {new_count} | Kuyruk: {len(self.queue)}/{Config.BATCH_SIZE} | Atılan: {self.queue.dropped}"
             print(status, end='\r', flush=True)
             
         except requests.exceptions.Timeout:
+            self._record_scan(started, status='timeout')
             print("⏳ Reddit timeout, tekrar denenecek...")
         except requests.exceptions.RequestException as e:
+            self._record_scan(started, status='error')
             print(f"⚠️ İstek hatası: {e}")
     
+    def _record_scan(self, started, fetched=0, new=0, status='ok'):
+        """Tarama telemetrisini Parquet'e ekle"""
+        if self.parquet:
+            self.parquet.add_scan(fetched, new, len(self.queue), self.queue.dropped, time.time() - started, status)
+    
     def _process_post(self, post_data):
         """Tek bir postu işle"""
         pid = post_data.get('id')
@@ -328,6 +2267,10 @@ class MarketRadar:
         
         self.seen_posts.add(pid)
         
+        # Filtrelerden önce ham hali arşivle
+        if self.archive:
+            self.archive.add(post_data)
+        
         title = post_data.get('title', '')
         selftext = post_data.get('selftext', '')
         full_text = (title + " " + selftext).lower()
@@ -337,44 +2280,146 @@ class MarketRadar:
             return False
         
         # Keyword kontrolü
-        if any(kw in full_text for kw in Config.KEYWORDS):
-            print(f"\n➕ Buffer'a eklendi: {title[:50]}...", flush=True)
+        keywords = [kw for kw in Config.KEYWORDS if kw in full_text]
+        if keywords:
+            self.keyword_stats.record_hits(keywords, post_data.get('subreddit'))
+        
+        # Budama politikasıyla kapatılan keyword'ler artık tetiklemez
+        keywords = self.keyword_stats.active(keywords)
+        if keywords:
+            priority = AnalysisQueue.priority(post_data, keywords, self.keyword_stats.weights())
+            print(f"\n➕ Kuyruğa eklendi (Öncelik: {priority}): {title[:50]}...", flush=True)
             
-            self.post_buffer.append({
+            self.queue.push({
+                "id": pid,
                 "text": title + "\n" + selftext,
-                "permalink": f"https://www.reddit.com{post_data['permalink']}"
+                "permalink": f"https://www.reddit.com{post_data['permalink']}",
+                "subreddit": post_data.get('subreddit'),
+                "created_utc": post_data.get('created_utc'),
+                # Kuyrukta beklerken yeniden puanlama için etkileşim sinyalleri
+                "ups": post_data.get('ups', 0),
+                "num_comments": post_data.get('num_comments', 0),
+                "keywords": keywords,
+                "priority": priority,
+                "queued_at": time.time()
             })
             return True
         
         return False
     
-    def _analyze_buffer(self):
-        """Buffer'daki postları analiz et"""
-        results = self.analyzer.analyze_batch(self.post_buffer)
+    def _dispatch(self):
+        """Kuyruktan analiz batch'leri çıkar: önce hızlı şerit, sonra dolu batch'ler (bütçe dahilinde)"""
+        budget = self.queue.budget_left()
+        
+        # Bekleyen postlar yaşlandıkça sıralama değişir
+        self.queue.rescore(self.keyword_stats.weights())
+        
+        # Kotanın yarısından fazlası harcandıysa düşük öncelikli postları at
+        if budget is not None and budget < Config.HOURLY_BATCH_BUDGET / 2:
+            self.queue.shed_low_priority()
+        
+        if budget is not None and budget <= 0:
+            return
+        
+        # Hızlı şerit: yüksek öncelikli postlar batch dolmasını beklemez.
+        # Batch modunda da canlı analizden geçer (Batch API 24 saate kadar sürebilir)
+        express = self.queue.pop_express()
+        if express:
+            print(f"\n🚨 Hızlı şerit: {len(express)} yüksek öncelikli post analiz ediliyor.", flush=True)
+            self._analyze_buffer(express, live=True)
+            if budget is not None:
+                budget -= 1
+        
+        # Dolu batch'ler: bütçe ve havuz kapasitesi kadar, en öncelikliler önce
+        full_batches = len(self.queue) // Config.BATCH_SIZE
+        if budget is not None:
+            full_batches = min(full_batches, budget)
+        if full_batches > 0:
+            self._analyze_buffer(self.queue.pop(full_batches * Config.BATCH_SIZE))
+    
+    def _analyze_buffer(self, posts, live=False):
+        """Kuyruktan alınan postları analiz et (büyük listeler anahtar havuzunda paralel işlenir).
+        
+        `live=True` batch modunda bile postları anlık analiz eder (hızlı şerit).
+        """
+        batches = [
+            posts[i:i + Config.BATCH_SIZE]
+            for i in range(0, len(posts), Config.BATCH_SIZE)
+        ]
+        
+        if self.batch_offload and not live:
+            # Çevrimdışı mod: canlı kotayı harcamadan Batch API kuyruğuna yaz
+            self.batch_offload.enqueue(batches)
+        else:
+            analyzer = self.screening or self.analyzer
+            batch_results = analyzer.analyze_batches(batches)
+            
+            # Anahtar bulunamayan batch'ler analiz edilmedi: postları kuyruğa geri koy
+            done = [(b, r) for b, r in zip(batches, batch_results) if r is not None]
+            for batch, results in zip(batches, batch_results):
+                if results is None:
+                    for post in batch:
+                        self.queue.push(post)
+            
+            self.queue.spend(len(done))
+            if done:
+                self._handle_results([b for b, _ in done], [r for _, r in done])
+    
+    def _poll_batch_jobs(self):
+        """Tamamlanan Batch API işlerinin sonuçlarını işle"""
+        for batches, batch_results in self.batch_offload.poll():
+            self._handle_results(batches, batch_results)
+    
+    def _handle_results(self, batches, batch_results):
+        """AI sonuçlarını post_id üzerinden batch'lerdeki postlarla eşleştir ve kaydet"""
         opportunities = []
         
-        for res in results:
-            if res.get("is_opportunity") and res.get("score", 0) >= Config.MIN_SCORE:
-                p_idx = res.get("post_id")
-                
-                if p_idx is not None and p_idx < len(self.post_buffer):
-                    real_link = self.post_buffer[p_idx]['permalink']
-                    
-                    # Konsola yazdır
-                    self._print_opportunity(res, real_link)
+        for batch, results in zip(batches, batch_results):
+            accepted = set()
+            for res in AIAnalyzer.normalize_results(results):
+                if res["is_opportunity"] and res["score"] >= Config.MIN_SCORE:
+                    p_idx = res["post_id"]
                     
-                    # CSV için hazırla
-                    opp = res.copy()
-                    opp['permalink'] = real_link
-                    opportunities.append(opp)
+                    if 0 <= p_idx < len(batch):
+                        real_link = batch[p_idx]['permalink']
+                        
+                        # Konsola yazdır
+                        self._print_opportunity(res, real_link)
+                        
+                        # CSV için hazırla
+                        opp = res.copy()
+                        opp['permalink'] = real_link
+                        opp['reddit_id'] = batch[p_idx].get('id')
+                        opp['subreddit'] = batch[p_idx].get('subreddit')
+                        opp['created_utc'] = batch[p_idx].get('created_utc')
+                        opp['keywords'] = batch[p_idx].get('keywords')
+                        opp['telemetry'] = batch[p_idx].get('telemetry')
+                        opportunities.append(opp)
+                        accepted.add(p_idx)
+                        
+                        # Abonelere anında gönder
+                        if self.events:
+                            self.events.publish(opp)
+            
+            # Hatalı dönen (sonuçsuz) batch'ler verim hesabını bozmasın
+            if results:
+                for i, post in enumerate(batch):
+                    self.keyword_stats.record_outcome(post, i in accepted)
+        
+        self.keyword_stats.apply_policy()
+        self.keyword_stats.save()
         
         if opportunities:
             CSVWriter.save(opportunities)
+            if self.parquet:
+                self.parquet.add_opportunities(opportunities)
+            for opp in opportunities:
+                if self.clusterer:
+                    self.clusterer.add(opp)
+                if self.tracker:
+                    self.tracker.track(opp)
         else:
             print("❌ Bu pakette yüksek puanlı fırsat bulunamadı.\n")
-        
-        # Buffer'ı temizle
-        self.post_buffer = []
     
     def _print_opportunity(self, opp, link):
         """Fırsat bilgisini yazdır"""
@@ -387,15 +2432,101 @@ class MarketRadar:
         print("★"*60 + "\n", flush=True)
 
 
+def search_archive(keywords, replay=False):
+    """Arşivde keyword setini dene, istenirse eşleşmeleri AIAnalyzer'dan geçir"""
+    archive = PostArchive()
+    started = time.time()
+    matches = archive.search(keywords)
+    elapsed = time.time() - started
+    
+    stats = archive.stats()
+    print(f"\n🔎 {stats['posts']} arşivlenmiş posttan {len(matches)} tanesi eşleşti ({elapsed:.2f} sn)")
+    for kw in keywords:
+        print(f"   {kw}: {sum(1 for m in matches if kw in m['keywords'])}")
+    
+    if not replay or not matches:
+        return
+    
+    # Reddit'e tekrar gitmeden eşleşmeleri analiz et (CSV'ye yazılmaz)
+    analyzer = AIAnalyzer()
+    posts = [{
+        "id": m['id'],
+        "text": m['title'] + "\n" + m['selftext'],
+        "permalink": f"https://www.reddit.com{m['permalink']}"
+    } for m in matches]
+    batches = [posts[i:i + Config.BATCH_SIZE] for i in range(0, len(posts), Config.BATCH_SIZE)]
+    
+    found = 0
+    for batch, results in zip(batches, analyzer.analyze_batches(batches)):
+        for res in AIAnalyzer.normalize_results(results):
+            p_idx = res["post_id"]
+            if res["is_opportunity"] and res["score"] >= Config.MIN_SCORE and 0 <= p_idx < len(batch):
+                found += 1
+                print(f"🚀 ({res.get('score')}/10) {batch[p_idx]['permalink']} - {res.get('pain_point', 'N/A')}")
+    print(f"\n📊 Tekrar analiz: {len(posts)} post, {found} fırsat.")
+
+
 def main():
     """Ana giriş noktası"""
+    # Trend raporu modu: python market_radar_v2.py --trends [--import-csv]
+    if '--trends' in sys.argv:
+        clusterer = OpportunityClusterer()
+        if '--import-csv' in sys.argv:
+            clusterer.clusters = []
+            imported = clusterer.import_csv()
+            clusterer.save()
+            print(f"📥 {imported} kayıt CSV'den kümelere aktarıldı.")
+        clusterer.print_trends()
+        return
+    
+    # Etkileşim raporu: python market_radar_v2.py --traction
+    if '--traction' in sys.argv:
+        EngagementTracker().print_traction()
+        return
+    
+    # Budanan keyword'leri geri aç: python market_radar_v2.py --reset-keywords ["kw1,kw2"]
+    if '--reset-keywords' in sys.argv:
+        idx = sys.argv.index('--reset-keywords')
+        keywords = None
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith('--'):
+            keywords = [k.strip().lower() for k in sys.argv[idx + 1].split(',') if k.strip()]
+        stats = KeywordStats()
+        reset = stats.reset(keywords)
+        stats.save()
+        print(f"♻️ Tekrar aktif edilen keyword'ler: {', '.join(reset) or 'yok'}")
+        return
+    
+    # Keyword verim raporu: python market_radar_v2.py --keyword-stats
+    if '--keyword-stats' in sys.argv:
+        KeywordStats().print_report()
+        return
+    
+    # CSV geçmişini Parquet'e aktar: python market_radar_v2.py --export-parquet
+    if '--export-parquet' in sys.argv:
+        try:
+            exported = ParquetExporter().import_csv()
+        except ImportError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"📦 {exported} fırsat Parquet'e aktarıldı ({Config.PARQUET_DIR}/opportunities).")
+        return
+    
+    # Arşiv sorgusu: python market_radar_v2.py --archive-search "kw1,kw2" [--replay]
+    if '--archive-search' in sys.argv:
+        idx = sys.argv.index('--archive-search')
+        keywords = Config.KEYWORDS
+        if idx + 1 < len(sys.argv) and not sys.argv[idx + 1].startswith('--'):
+            keywords = [k.strip().lower() for k in sys.argv[idx + 1].split(',') if k.strip()]
+        search_archive(keywords, replay='--replay' in sys.argv)
+        return
+    
     # Gerekli API key kontrolü
-    if Config.AI_PROVIDER == 'openai' and not Config.OPENAI_API_KEY:
+    if Config.AI_PROVIDER == 'openai' and not Config.api_keys('openai'):
         print("❌ OPENAI_API_KEY bulunamadı!")
         print("   .env dosyasına OPENAI_API_KEY=sk-xxx ekleyin.")
         sys.exit(1)
     
-    if Config.AI_PROVIDER == 'gemini' and not Config.GEMINI_API_KEY:
+    if Config.AI_PROVIDER == 'gemini' and not Config.api_keys('gemini'):
         print("❌ GEMINI_API_KEY bulunamadı!")
         print("   .env dosyasına GEMINI_API_KEY=xxx ekleyin.")
         sys.exit(1)
@@ -0,0 +1,6 @@
+"""Testler market_radar_v2 modülünü depo kökünden içe aktarır"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
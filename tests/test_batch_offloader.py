@@ -0,0 +1,175 @@
+"""BatchOffloader: sahte OpenAI istemcisiyle gönderim, sonuç toplama ve yeniden kuyruğa alma"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from market_radar_v2 import AIAnalyzer, BatchOffloader, Config
+
+
+class FakeFiles:
+    """client.files taklidi: yüklenen JSONL'leri ve indirilecek çıktıları bellekte tutar"""
+    
+    def __init__(self):
+        self.uploads = []
+        self.contents = {}
+    
+    def create(self, file, purpose):
+        self.uploads.append([json.loads(line) for line in file.read().decode('utf-8').splitlines()])
+        return SimpleNamespace(id=f"file-{len(self.uploads)}")
+    
+    def content(self, file_id):
+        return SimpleNamespace(text=self.contents[file_id])
+
+
+class FakeBatches:
+    """client.batches taklidi: işler test içinden tamamlanır"""
+    
+    def __init__(self):
+        self.jobs = {}
+    
+    def create(self, input_file_id, endpoint, completion_window):
+        job = SimpleNamespace(
+            id=f"batch_{len(self.jobs) + 1}", status="in_progress", input_file_id=input_file_id,
+            output_file_id=None, error_file_id=None, errors=None
+        )
+        self.jobs[job.id] = job
+        return job
+    
+    def retrieve(self, job_id):
+        return self.jobs[job_id]
+
+
+def output_line(custom_id, results):
+    """Batch API çıktı dosyasındaki başarılı bir satır"""
+    return json.dumps({
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {
+                "choices": [{"message": {"content": json.dumps({"results": results})}}],
+                "usage": {"prompt_tokens": 100, "completion_tokens": 20}
+            }
+        }
+    })
+
+
+def make_batch(name):
+    return [{"permalink": f"/r/test/{name}", "text": f"{name} icin bir arac lazim"}]
+
+
+@pytest.fixture
+def config(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'BATCH_API_DIR', str(tmp_path))
+    monkeypatch.setattr(Config, 'BATCH_API_MIN_REQUESTS', 2)
+    monkeypatch.setattr(Config, 'BATCH_API_MAX_ATTEMPTS', 2)
+    monkeypatch.setattr(Config, 'BATCH_API_MAX_WAIT', 3600)
+    return tmp_path
+
+
+@pytest.fixture
+def client():
+    return SimpleNamespace(files=FakeFiles(), batches=FakeBatches())
+
+
+@pytest.fixture
+def offloader(config, client):
+    # openai paketi/anahtarı gerekmesin diye istemci kurulumu atlanır
+    analyzer = AIAnalyzer.__new__(AIAnalyzer)
+    analyzer.provider = 'openai'
+    analyzer.model = 'gpt-4o-mini'
+    return BatchOffloader(analyzer, client=client)
+
+
+def complete(client, job_id, lines, status="completed", error_lines=None):
+    job = client.batches.jobs[job_id]
+    job.status = status
+    job.output_file_id = f"out-{job_id}"
+    client.files.contents[job.output_file_id] = "\n".join(lines)
+    if error_lines is not None:
+        job.error_file_id = f"err-{job_id}"
+        client.files.contents[job.error_file_id] = "\n".join(error_lines)
+
+
+def test_enqueue_waits_for_min_requests_then_submits(offloader, client):
+    offloader.enqueue([make_batch("a")])
+    assert client.files.uploads == []
+    assert len(offloader.pending) == 1
+    
+    offloader.enqueue([make_batch("b")])
+    assert offloader.pending == []
+    assert list(offloader.jobs) == ["batch_1"]
+    
+    lines = client.files.uploads[0]
+    assert [line['custom_id'] for line in lines] == ["batch-0", "batch-1"]
+    assert lines[0]['url'] == BatchOffloader.ENDPOINT
+    assert lines[0]['body']['response_format'] == {"type": "json_object"}
+
+
+def test_poll_merges_results_and_resubmits_missing(offloader, client):
+    offloader.enqueue([make_batch("a"), make_batch("b")])
+    complete(client, "batch_1", [output_line("batch-0", [{"post_id": 0, "is_opportunity": True, "score": 9}])])
+    
+    finished = offloader.poll(force=True)
+    
+    assert len(finished) == 1
+    batches, results = finished[0]
+    assert batches[0][0]['permalink'] == "/r/test/a"
+    assert results == [[{"post_id": 0, "is_opportunity": True, "score": 9}]]
+    assert batches[0][0]['telemetry']['tokens'] == 120
+    
+    # Sonucu gelmeyen batch yeni enqueue beklemeden tekrar gönderilir
+    assert offloader.pending == []
+    assert list(offloader.jobs) == ["batch_2"]
+    assert offloader.jobs["batch_2"]['batches'][0]['attempts'] == 2
+    assert client.files.uploads[1][0]['body']['messages'][1]['content'].count("/r/test/b") == 1
+
+
+def test_poll_drops_batches_after_max_attempts(offloader, client):
+    offloader.enqueue([make_batch("a"), make_batch("b")])
+    complete(client, "batch_1", [], status="failed")
+    assert offloader.poll(force=True) == []
+    assert list(offloader.jobs) == ["batch_2"]
+    
+    complete(client, "batch_2", [], status="failed")
+    assert offloader.poll(force=True) == []
+    assert offloader.jobs == {}
+    assert offloader.pending == []
+
+
+def test_malformed_error_and_output_lines_do_not_block_job(offloader, client):
+    offloader.enqueue([make_batch("a"), make_batch("b")])
+    complete(
+        client, "batch_1",
+        [output_line("batch-0", [{"post_id": 0, "is_opportunity": False}]), "not json"],
+        error_lines=["garbage", json.dumps({"custom_id": "batch-1", "error": {"message": "boom"}})]
+    )
+    
+    finished = offloader.poll(force=True)
+    
+    assert len(finished) == 1
+    assert "batch_1" not in offloader.jobs
+
+
+def test_stale_pending_is_submitted_below_min_requests(offloader, client, monkeypatch):
+    offloader.enqueue([make_batch("a")])
+    assert offloader.jobs == {}
+    
+    monkeypatch.setattr(Config, 'BATCH_API_MAX_WAIT', 0)
+    offloader.poll(force=True)
+    assert list(offloader.jobs) == ["batch_1"]
+
+
+def test_state_survives_restart_and_converts_legacy_lists(config, client, offloader):
+    offloader.enqueue([make_batch("a")])
+    
+    # Eski durum dosyalarında kuyruk elemanları düz post listeleriydi
+    state_file = config / "state.json"
+    state = json.loads(state_file.read_text(encoding='utf-8'))
+    state['pending'].append(make_batch("legacy"))
+    state_file.write_text(json.dumps(state), encoding='utf-8')
+    
+    restored = BatchOffloader(offloader.analyzer, client=client)
+    assert [e['posts'][0]['permalink'] for e in restored.pending] == ["/r/test/a", "/r/test/legacy"]
+    assert restored.pending[1]['attempts'] == 0
@@ -0,0 +1,132 @@
+"""LocalModelClient ve ön eleme: sahte session ile response_format geri dönüşü ve serbest metin JSON"""
+
+import json
+
+import pytest
+
+from market_radar_v2 import AIAnalyzer, Config, LocalModelClient, ScreeningAnalyzer
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+    
+    def json(self):
+        return json.loads(self.text)
+
+
+class FakeSession:
+    """requests.Session taklidi: sıradaki yanıtı döndürür, gönderilen gövdeleri kaydeder"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.bodies = []
+    
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.bodies.append(json)
+        return self.responses.pop(0)
+
+
+def completion(content):
+    return FakeResponse(200, json.dumps({
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 50, "completion_tokens": 10}
+    }))
+
+
+BODY = {"model": "m", "messages": [], "response_format": {"type": "json_object"}}
+
+
+def test_rejected_response_format_falls_back_to_plain_json():
+    session = FakeSession(
+        FakeResponse(400, '{"error": "response_format is not supported"}'),
+        completion('[{"post_id": 0}]'),
+        completion('[{"post_id": 1}]')
+    )
+    client = LocalModelClient(session=session)
+    
+    client.chat(dict(BODY))
+    client.chat(dict(BODY))
+    
+    assert client.json_mode is False
+    assert ['response_format' in body for body in session.bodies] == [True, False, False]
+
+
+def test_unrelated_400_keeps_json_mode_and_raises_original_error():
+    session = FakeSession(
+        FakeResponse(400, '{"error": "context length exceeded"}'),
+        FakeResponse(400, '{"error": "context length exceeded"}')
+    )
+    client = LocalModelClient(session=session)
+    
+    with pytest.raises(RuntimeError) as excinfo:
+        client.chat(dict(BODY))
+    
+    assert excinfo.value.status_code == 400
+    assert client.json_mode is True
+
+
+def test_plain_mode_parses_chatty_fenced_output():
+    analyzer = AIAnalyzer('local')
+    content = (
+        "Sure! Here is the JSON:\n```json\n"
+        '[{"post_id": 0, "is_opportunity": true, "score": 8}]\n```\n'
+        "Note: post 1 [skipped] because it was too short."
+    )
+    client = LocalModelClient(session=FakeSession(FakeResponse(422, "response_format"), completion(content)))
+    
+    results, usage = analyzer._analyze_with_local(client, "prompt")
+    
+    assert results == [{"post_id": 0, "is_opportunity": True, "score": 8}]
+    assert usage['prompt_tokens'] == 50
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"results": [{"post_id": 0}]}', [{"post_id": 0}]),
+    ('[{"post_id":0}]\nNote: post 1 [skipped]', [{"post_id": 0}]),
+    ('Draft [v2] below:\n{"post_id": 3}', [{"post_id": 3}]),
+])
+def test_parse_openai_content_tolerates_surrounding_text(text, expected):
+    assert AIAnalyzer.parse_openai_content(text) == expected
+
+
+def test_normalize_results_coerces_types():
+    results = AIAnalyzer.normalize_results([
+        {"post_id": "0", "is_opportunity": "true", "score": "9"},
+        {"post_id": None, "score": 9},
+        {"post_id": 1, "score": None},
+        "not a dict"
+    ])
+    
+    assert results == [
+        {"post_id": 0, "is_opportunity": True, "score": 9},
+        {"post_id": 1, "is_opportunity": False, "score": 0}
+    ]
+
+
+class StubAnalyzer:
+    def __init__(self, results):
+        self.results = results
+        self.batches = None
+    
+    def analyze_batches(self, batches):
+        self.batches = batches
+        return self.results
+
+
+def test_screening_handles_string_scores(monkeypatch):
+    monkeypatch.setattr(Config, 'SCREEN_ACCEPT_SCORE', 8)
+    monkeypatch.setattr(Config, 'SCREEN_ESCALATE_MIN', 4)
+    screener = StubAnalyzer([[
+        {"post_id": 0, "is_opportunity": True, "score": "9"},
+        {"post_id": "1", "is_opportunity": True, "score": "5"},
+        {"post_id": 2, "is_opportunity": False, "score": None}
+    ]])
+    hosted = StubAnalyzer([[{"post_id": "0", "is_opportunity": True, "score": "7"}]])
+    batch = [{"permalink": f"/r/test/{i}", "text": "t"} for i in range(3)]
+    
+    final = ScreeningAnalyzer(screener, hosted).analyze_batches([batch])
+    
+    assert hosted.batches == [[batch[1]]]
+    assert sorted((r['post_id'], r['is_opportunity']) for r in final[0]) == [(0, True), (1, True), (2, False)]